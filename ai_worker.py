@@ -0,0 +1,191 @@
+import multiprocessing
+import queue
+import bitboard
+import game_classes
+import othello_ai
+
+
+# The worker process runs one search at a time. The application sends it
+#
+#     ('search', job id, position, seconds)      search and report the move
+#     ('ponder', job id, position)               search until cancelled
+#     ('quit',)                                  end the worker
+#
+# where a position is (rows, columns, black mask, white mask, player to
+# move, winner mode). The worker answers on the message queue with
+#
+#     ('progress', job id, depth, square, score, nodes per second)
+#     ('done', job id, square, score, depth, nodes, seconds)
+#
+# with a square of None if the player to move had no moves.
+# A job is cancelled by raising the shared cancelled-up-to job id to at
+# least its own id, which the search checks while it runs.
+
+SEARCH = 'search'
+PONDER = 'ponder'
+QUIT = 'quit'
+PROGRESS = 'progress'
+DONE = 'done'
+
+
+def position_of(game: "GameState") -> (int, int, int, int, int, str):
+    '''
+    Describes the position of a game for sending to the worker.
+    '''
+    black, white = game.disc_masks()
+    return (game.no_of_rows(), game.no_of_col(), black, white,
+            game.player_making_move(), game.winner_mode())
+
+
+def _worker_main(commands: "Queue", messages: "Queue", cancelled_up_to: "Value",
+                 hash_megabytes: float) -> None:
+    '''
+    Runs searches for the application until told to quit. The same
+    AIPlayer is used for every search, so what was learned while pondering
+    is still in its transposition table when the real search starts.
+    '''
+    player = othello_ai.AIPlayer(hash_megabytes = hash_megabytes)
+
+    while True:
+        command = commands.get()
+
+        if command[0] == QUIT:
+            return
+
+        job_id, position = command[1], command[2]
+        rows, col, black, white, player_making_move, winner_mode = position
+        game = game_classes.GameState(game_classes.BLACK, winner_mode, rows, col,
+                                      game_classes.BLACK, bitboard.BitBoard)
+        game.load_position(black, white, player_making_move)
+        player.set_time_budget(command[3] if command[0] == SEARCH else None)
+
+        def progress(result: othello_ai.SearchResult) -> None:
+            messages.put((PROGRESS, job_id, result.depth, result.square, result.score,
+                          result.nodes_per_second()))
+
+        try:
+            result = player.search(game, progress, lambda: cancelled_up_to.value >= job_id)
+        except game_classes.InvalidMoveError:
+            # The player to move has no moves, so there is nothing to play.
+            messages.put((DONE, job_id, None, 0, 0, 0, 0.0))
+        else:
+            messages.put((DONE, job_id, result.square, result.score, result.depth,
+                           result.nodes, result.elapsed))
+
+
+class SearchHandle:
+    '''
+    Stands for one job given to an AIWorker. It collects the job's
+    progress and result as the worker's messages are polled.
+    '''
+    def __init__(self, worker: "AIWorker", job_id: int, pondering: bool) -> None:
+        self.job_id = job_id
+        self.pondering = pondering
+        self.depth = 0
+        self.square = None
+        self.score = 0
+        self.nodes_per_second = 0.0
+        self.finished = False
+        self._worker = worker
+
+    def cancel(self) -> None:
+        '''
+        Stops the job. A cancelled job still reports its best move so far.
+        '''
+        self._worker.cancel(self)
+
+    def _update(self, message: tuple) -> None:
+        if message[0] == PROGRESS:
+            self.depth, self.square, self.score, self.nodes_per_second = message[2:]
+        else:
+            self.square, self.score, self.depth = message[2:5]
+            self.finished = True
+
+
+class AIWorker:
+    '''
+    Runs AIPlayer searches in a separate process, so that a long search
+    does not hold up the tkinter event loop. Searches are started with
+    search or ponder, and their messages are collected by calling poll,
+    for example from a callback scheduled with after.
+    '''
+    def __init__(self, hash_megabytes: float = 16) -> None:
+        self._commands = multiprocessing.Queue()
+        self._messages = multiprocessing.Queue()
+        self._cancelled_up_to = multiprocessing.Value('q', 0, lock = False)
+        self._process = multiprocessing.Process(target = _worker_main, daemon = True,
+                                                args = (self._commands, self._messages,
+                                                        self._cancelled_up_to, hash_megabytes))
+        self._process.start()
+        self._last_job_id = 0
+        self._handles = {}
+
+    def search(self, game: "GameState", seconds: float) -> SearchHandle:
+        '''
+        Starts looking for the move of the player whose turn it is,
+        taking about the given number of seconds.
+        '''
+        return self._start(SEARCH, game, seconds)
+
+    def ponder(self, game: "GameState") -> SearchHandle:
+        '''
+        Starts searching the position with no time limit, to fill the
+        transposition table while the other player thinks. The job should
+        be cancelled once that player moves.
+        '''
+        return self._start(PONDER, game, None)
+
+    def cancel(self, handle: SearchHandle) -> None:
+        '''
+        Stops the given job, along with any earlier ones.
+        '''
+        self._cancelled_up_to.value = max(self._cancelled_up_to.value, handle.job_id)
+
+    def poll(self) -> [SearchHandle]:
+        '''
+        Reads every message the worker has sent without waiting. Returns
+        the handles whose jobs made progress or finished.
+        '''
+        updated = []
+
+        while True:
+            try:
+                message = self._messages.get_nowait()
+            except queue.Empty:
+                return updated
+
+            handle = self._handles.get(message[1])
+
+            if handle is None:
+                continue
+
+            handle._update(message)
+
+            if handle.finished:
+                del self._handles[handle.job_id]
+
+            if handle not in updated:
+                updated.append(handle)
+
+    def close(self) -> None:
+        '''
+        Cancels every job and ends the worker process.
+        '''
+        self._cancelled_up_to.value = self._last_job_id
+        self._commands.put((QUIT,))
+        self._process.join(1)
+
+        if self._process.is_alive():
+            self._process.terminate()
+
+    def _start(self, kind: str, game: "GameState", seconds: float) -> SearchHandle:
+        self._last_job_id += 1
+        handle = SearchHandle(self, self._last_job_id, kind == PONDER)
+        self._handles[handle.job_id] = handle
+
+        if kind == SEARCH:
+            self._commands.put((SEARCH, handle.job_id, position_of(game), seconds))
+        else:
+            self._commands.put((PONDER, handle.job_id, position_of(game)))
+
+        return handle
@@ -0,0 +1,364 @@
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import json
+import math
+import multiprocessing
+import os
+import time
+import bitboard
+import game_classes
+import othello_ai
+import replay
+from game_classes import COLORS, COLOR_NAMES
+
+
+# A small HTTP server for analysing positions from other programs. It
+# answers two requests:
+#
+#     POST /analyze    the legal moves of a position and, for a depth above
+#                      0, the best move found by a search of that depth
+#     GET /stats       cache and deduplication counts, searches in flight
+#                      and request latency percentiles
+#
+# The body of /analyze is a JSON object giving the position either as a game
+# record (see replay.py), which is replayed from the start:
+#
+#     {"record": "8x8 B W > f5d6c3", "depth": 6}
+#
+# or as the rows of the board from the top, with B, W and - for each cell:
+#
+#     {"rows": 4, "col": 4, "board": ["----", "-WB-", "-BW-", "----"],
+#      "player": "B", "mode": ">", "depth": 6}
+#
+# The best move's principal variation lists "pass" where a player has to pass.
+#
+# Searches run in a pool of worker processes. A search for a position which
+# is already being searched waits for that search instead of starting
+# another, and finished searches are kept in a least-recently-used cache.
+
+CELLS = {'B': game_classes.BLACK, 'W': game_classes.WHITE, '-': game_classes.EMPTY}
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found',
+               405: 'Method Not Allowed', 413: 'Payload Too Large', 500: 'Internal Server Error'}
+MAX_BODY = 65536            # Largest request body accepted, in bytes
+LATENCY_SAMPLES = 1000      # Recent requests the latency percentiles cover
+
+
+class InvalidRequest(Exception):
+    pass
+
+
+def game_from_request(request: dict) -> game_classes.GameState:
+    '''
+    Sets up the game described by an /analyze request. Raises
+    InvalidRequest if the description is malformed or illegal.
+    '''
+    try:
+        if 'record' in request:
+            rows, col, first, topleft, mode, moves = replay.parse_record(request['record'])
+            game = game_classes.GameState(first, mode, rows, col, topleft, bitboard.BitBoard)
+
+            for row_index, col_index in moves:
+                game.player_take_turn(row_index, col_index)
+                game.next_player_turn()
+
+            return game
+
+        rows, col, board = int(request['rows']), int(request['col']), request['board']
+        mode = request['mode']
+
+        if not game_classes.valid_size(rows, col) \
+           or mode not in game_classes.WINNER_MODES or len(board) != rows \
+           or any(len(row) != col for row in board):
+            raise InvalidRequest
+
+        black = 0
+        white = 0
+
+        for row_index, row in enumerate(board):
+            for col_index, cell in enumerate(row):
+                if CELLS[cell] == game_classes.BLACK:
+                    black |= 1 << (row_index*col + col_index)
+                elif CELLS[cell] == game_classes.WHITE:
+                    white |= 1 << (row_index*col + col_index)
+
+        game = game_classes.GameState(game_classes.BLACK, mode, rows, col,
+                                      game_classes.BLACK, bitboard.BitBoard)
+        game.load_position(black, white, COLORS[request['player']])
+
+        # A player with no moves passes, as in a game.
+        if not game.legal_moves():
+            game.next_player_turn()
+
+        return game
+    except (game_classes.InvalidMoveError, replay.InvalidRecord,
+            KeyError, TypeError, ValueError, AttributeError):
+        raise InvalidRequest
+
+
+def position_key(game: game_classes.GameState, depth: int) -> (int, int, int, int, int, str, int):
+    '''
+    Returns the key a search of the game's position is cached under. It is
+    also the job handed to the worker processes.
+    '''
+    black, white = game.disc_masks()
+    return (game.no_of_rows(), game.no_of_col(), black, white,
+            game.player_making_move(), game.winner_mode(), depth)
+
+
+_players = {}
+
+
+def search_position(job: (int, int, int, int, int, str, int)) -> dict:
+    '''
+    Searches a position in a worker process and describes the best move.
+    Each process keeps an AIPlayer for every depth it is asked for.
+    '''
+    rows, col, black, white, player_making_move, mode, depth = job
+    player = _players.get(depth)
+
+    if player is None:
+        player = othello_ai.AIPlayer(time_budget = None, max_depth = depth)
+        _players[depth] = player
+
+    game = game_classes.GameState(game_classes.BLACK, mode, rows, col,
+                                  game_classes.BLACK, bitboard.BitBoard)
+    game.load_position(black, white, player_making_move)
+    result = player.search(game)
+
+    return {'move': square_to_text(result.square, col),
+            'score': result.score,
+            'depth': result.depth,
+            'nodes': result.nodes,
+            'seconds': round(result.elapsed, 6),
+            'pv': [square_to_text(square, col) for square in result.principal_variation]}
+
+
+def square_to_text(square: int, col: int) -> str:
+    '''
+    Converts a square of a principal variation into a move such as "d3",
+    or "pass".
+    '''
+    if square == othello_ai.PASS:
+        return 'pass'
+
+    return replay.move_to_text(*divmod(square, col))
+
+
+def percentile(sorted_values: [float], fraction: float) -> float:
+    '''
+    Returns the nearest-rank percentile of a sorted, non-empty list.
+    '''
+    rank = max(1, math.ceil(fraction*len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class AnalysisServer:
+    '''
+    Answers analysis requests, searching positions on a process pool.
+    Results are cached for up to cache_size positions, and searches are
+    limited to max_depth.
+    '''
+    def __init__(self, processes: int = None, cache_size: int = 10000, max_depth: int = 12) -> None:
+        self._processes = processes or os.cpu_count() or 1
+        # Spawned workers do not inherit the sockets of open connections,
+        # which would otherwise stay open in them after the server closes its end.
+        self._pool = concurrent.futures.ProcessPoolExecutor(
+            self._processes, mp_context = multiprocessing.get_context('spawn'))
+        self._cache_size = cache_size
+        self._max_depth = max_depth
+        self._cache = collections.OrderedDict()     # Position key to result, oldest first
+        self._in_flight = {}                        # Position key to the future of its search
+        self._latencies = collections.deque(maxlen = LATENCY_SAMPLES)
+        self._counts = collections.Counter()
+
+    def close(self) -> None:
+        self._pool.shutdown(cancel_futures = True)
+
+    async def analyze(self, request: dict) -> dict:
+        '''
+        Answers an /analyze request. Raises InvalidRequest if it is malformed.
+        '''
+        if not isinstance(request, dict):
+            raise InvalidRequest
+
+        game = game_from_request(request)
+        depth = request.get('depth', 0)
+
+        # JSON's true and false come back as bools, which count as integers.
+        if not isinstance(depth, int) or isinstance(depth, bool) or not 0 <= depth <= self._max_depth:
+            raise InvalidRequest
+
+        player = game.player_making_move()
+        answer = {'black': game.black_score(),
+                  'white': game.white_score(),
+                  'player': None if player is None else COLOR_NAMES[player],
+                  'winner': None if game.get_winner() is None else COLOR_NAMES[game.get_winner()],
+                  'moves': {replay.move_to_text(row_index, col_index): len(flips)
+                            for (row_index, col_index), flips in sorted(game.legal_moves().items())}}
+
+        if depth > 0 and player is not None:
+            answer['best'] = await self._search(position_key(game, depth))
+
+        return answer
+
+    def stats(self) -> dict:
+        '''
+        Answers a /stats request.
+        '''
+        stats = dict(self._counts)
+        stats['cached_positions'] = len(self._cache)
+        stats['searches_in_flight'] = len(self._in_flight)
+        stats['queue_depth'] = max(0, len(self._in_flight) - self._processes)
+        stats['processes'] = self._processes
+
+        if self._latencies:
+            latencies = sorted(self._latencies)
+            stats['latency_ms'] = {name: round(1000*percentile(latencies, fraction), 3)
+                                   for name, fraction in (('p50', 0.5), ('p90', 0.9),
+                                                          ('p99', 0.99), ('max', 1.0))}
+
+        return stats
+
+    async def _search(self, key: tuple) -> dict:
+        result = self._cache.get(key)
+
+        if result is not None:
+            self._cache.move_to_end(key)
+            self._counts['cache_hits'] += 1
+            return result
+
+        future = self._in_flight.get(key)
+
+        if future is None:
+            self._counts['searches'] += 1
+            future = asyncio.get_running_loop().run_in_executor(self._pool, search_position, key)
+            self._in_flight[key] = future
+            future.add_done_callback(lambda done: self._search_done(key, done))
+        else:
+            self._counts['deduplicated'] += 1
+
+        # A client hanging up must not cancel a search others are waiting for.
+        return await asyncio.shield(future)
+
+    def _search_done(self, key: tuple, future: asyncio.Future) -> None:
+        del self._in_flight[key]
+
+        if future.cancelled() or future.exception() is not None:
+            return
+
+        self._cache[key] = future.result()
+
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last = False)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        '''
+        Reads one HTTP request from a connection and writes the answer.
+        '''
+        try:
+            status, answer = await self._answer(reader)
+            body = json.dumps(answer).encode()
+            writer.write("HTTP/1.1 {} {}\r\nContent-Type: application/json\r\n"
+                         "Content-Length: {}\r\nConnection: close\r\n\r\n".format(
+                             status, STATUS_TEXT[status], len(body)).encode() + body)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _answer(self, reader: asyncio.StreamReader) -> (int, dict):
+        request_line = (await reader.readline()).decode('latin-1').split()
+        headers = {}
+
+        while True:
+            line = (await reader.readline()).decode('latin-1').strip()
+
+            if not line:
+                break
+
+            name, separator, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if len(request_line) != 3:
+            return 400, {'error': "malformed request line"}
+
+        method, path = request_line[0], request_line[1].split('?')[0]
+
+        if path == '/stats':
+            if method != 'GET':
+                return 405, {'error': "use GET"}
+
+            return 200, self.stats()
+
+        if path != '/analyze':
+            return 404, {'error': "unknown path"}
+
+        if method != 'POST':
+            return 405, {'error': "use POST"}
+
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            length = -1
+
+        if length < 0:
+            self._counts['invalid_requests'] += 1
+            return 400, {'error': "invalid Content-Length"}
+
+        if length > MAX_BODY:
+            return 413, {'error': "request body too large"}
+
+        start = time.perf_counter()
+        self._counts['requests'] += 1
+
+        try:
+            answer = await self.analyze(json.loads(await reader.readexactly(length)))
+        except (InvalidRequest, json.JSONDecodeError, UnicodeDecodeError):
+            self._counts['invalid_requests'] += 1
+            return 400, {'error': "invalid position or depth"}
+        except concurrent.futures.BrokenExecutor:
+            self._counts['failed_searches'] += 1
+            return 500, {'error': "the search workers stopped"}
+        except asyncio.IncompleteReadError:
+            raise
+        except Exception:
+            self._counts['failed_searches'] += 1
+            return 500, {'error': "the analysis failed"}
+
+        self._latencies.append(time.perf_counter() - start)
+        return 200, answer
+
+
+async def serve(host: str, port: int, processes: int, cache_size: int, max_depth: int) -> None:
+    analysis_server = AnalysisServer(processes, cache_size, max_depth)
+
+    try:
+        server = await asyncio.start_server(analysis_server.handle_connection, host, port)
+        print("Serving on http://{}:{}".format(host, port))
+
+        async with server:
+            await server.serve_forever()
+    finally:
+        analysis_server.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description = "Serve Othello position analysis over HTTP.")
+    parser.add_argument('--host', default = '127.0.0.1', help = "address to listen on")
+    parser.add_argument('--port', type = int, default = 8765, help = "port to listen on")
+    parser.add_argument('--processes', type = int, default = None, help = "worker processes")
+    parser.add_argument('--cache-size', type = int, default = 10000, help = "positions to keep results for")
+    parser.add_argument('--max-depth', type = int, default = 12, help = "deepest search allowed")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.processes, args.cache_size, args.max_depth))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import argparse
+import os
+import subprocess
+import sys
+import timeit
+import tracemalloc
+import cartesian
+import game_classes
+
+
+def cell_by_cell(no_of_rows: int, no_of_col: int) -> cartesian.RectangleState:
+    '''
+    Builds the grid of cell rectangles one cell at a time with two new
+    points per cell, the way the interface used to.
+    '''
+    width, height = 600, 600
+    rectangle_state = cartesian.RectangleState()
+
+    for row_index in range(no_of_rows):
+        for col_index in range(no_of_col):
+            p1 = cartesian.Point(col_index/no_of_col*width, row_index/no_of_rows*height, width, height)
+            p2 = cartesian.Point((col_index + 1)/no_of_col*width, (row_index + 1)/no_of_rows*height,
+                                 width, height)
+            rectangle_state.append_rect(cartesian.Rectangle(p1, p2))
+
+    return rectangle_state
+
+
+def measure(build: "Function", repeat: int) -> (float, int):
+    '''
+    Returns the average seconds taken by build() and the bytes still
+    allocated by the object it returns.
+    '''
+    seconds = timeit.timeit(build, number = repeat) / repeat
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del kept
+
+    return (seconds, allocated)
+
+
+def geometry_benchmark(sizes: [(int)], repeat: int) -> None:
+    '''
+    Compares building the cell rectangles one cell at a time with
+    RectangleState.grid for each board size.
+    '''
+    for no_of_rows, no_of_col in sizes:
+        for name, build in (("cell by cell", lambda: cell_by_cell(no_of_rows, no_of_col)),
+                            ("grid", lambda: cartesian.RectangleState.grid(no_of_rows, no_of_col))):
+            seconds, allocated = measure(build, repeat)
+            print("{}x{} {:14} {:10.1f} us {:10} bytes".format(
+                no_of_rows, no_of_col, name, seconds*1e6, allocated))
+
+
+def import_times(modules: [str]) -> {str: int}:
+    '''
+    Imports the modules in a fresh interpreter with python -X importtime
+    and returns the cumulative microseconds of every module it loaded.
+    '''
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import ' + ', '.join(modules)],
+                               cwd = os.path.dirname(os.path.abspath(__file__)),
+                               stderr = subprocess.PIPE, universal_newlines = True, check = True)
+    times = {}
+
+    # Lines look like "import time:   self [us] | cumulative | name".
+    for line in completed.stderr.splitlines():
+        fields = line.split('|')
+
+        if len(fields) == 3 and fields[1].strip().isdigit():
+            times[fields[2].strip()] = int(fields[1])
+
+    return times
+
+
+def import_benchmark(modules: [str], runs: int) -> None:
+    '''
+    Reports the fastest of several cold imports of the given modules, and
+    whether they pulled in tkinter.
+    '''
+    best = None
+
+    for run in range(runs):
+        times = import_times(modules)
+        total = sum(times.get(module, 0) for module in modules)
+
+        if best is None or total < best[0]:
+            best = (total, times)
+
+    total, times = best
+    print("import {:30} {:10.1f} ms   tkinter loaded: {}".format(
+        ', '.join(modules), total/1000, 'tkinter' in times))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description = "Time and measure parts of the program.")
+    parser.add_argument('--sizes', default = '8x8,16x16', help = "comma-separated sizes such as 8x8,6x10")
+    parser.add_argument('--repeat', type = int, default = 1000, help = "runs to average the times over")
+    parser.add_argument('--imports', default = 'game_classes,cartesian',
+                        help = "comma-separated modules whose cold import is timed")
+    parser.add_argument('--import-runs', type = int, default = 5,
+                        help = "fresh interpreters to take the fastest import time from")
+    args = parser.parse_args()
+
+    sizes = [game_classes.parse_size(size) for size in args.sizes.split(',')]
+    geometry_benchmark(sizes, args.repeat)
+    import_benchmark(args.imports.split(','), args.import_runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import mmap
+import struct
+import bitboard
+import game_classes
+
+
+# A position is a fixed-size record of POSITION_SIZE bytes:
+#
+#     rows, columns, player to move, winner mode    one byte each
+#     black discs, white discs                      32-byte little-endian bitmasks
+#
+# Bit row * columns + column of a mask stands for the cell at that address.
+# Because every record has the same size, a file of positions can be memory
+# mapped and record i read straight from offset i * POSITION_SIZE.
+#
+# A game record is a GAME_HEADER followed by one byte per move:
+#
+#     rows, columns, first player, top-left center disc, winner mode    one byte each
+#     number of moves                                                   two bytes
+#     moves                                                             row * columns + column
+#
+# Players and discs are stored as 0 (none), 1 (black) or 2 (white), and the
+# winner mode as 0 ('>') or 1 ('<').
+
+MASK_BYTES = 32
+POSITION = struct.Struct('<BBBB')
+POSITION_SIZE = POSITION.size + 2*MASK_BYTES
+GAME_HEADER = struct.Struct('<BBBBBH')
+
+PLAYER_CODES = {None: 0, game_classes.EMPTY: 0, game_classes.BLACK: 1, game_classes.WHITE: 2}
+PLAYERS = {0: None, 1: game_classes.BLACK, 2: game_classes.WHITE}
+MODE_CODES = {'>': 0, '<': 1}
+MODES = {0: '>', 1: '<'}
+
+
+class InvalidRecord(Exception):
+    pass
+
+
+def encode_position(rows: int, col: int, black: int, white: int,
+                    player_making_move: int, winner_mode: str) -> bytes:
+    '''
+    Packs a position into POSITION_SIZE bytes.
+    '''
+    return POSITION.pack(rows, col, PLAYER_CODES[player_making_move], MODE_CODES[winner_mode]) \
+        + black.to_bytes(MASK_BYTES, 'little') + white.to_bytes(MASK_BYTES, 'little')
+
+
+def encode_game_state(game: "GameState") -> bytes:
+    '''
+    Packs the position of a GameState into POSITION_SIZE bytes.
+    '''
+    black, white = game.disc_masks()
+    return encode_position(game.no_of_rows(), game.no_of_col(), black, white,
+                           game.player_making_move(), game.winner_mode())
+
+
+def decode_position(data: bytes, offset: int = 0) -> (int, int, int, int, int, str):
+    '''
+    Unpacks the position stored at the given offset. Returns the rows,
+    columns, black mask, white mask, player to move and winner mode.
+    '''
+    rows, col, player_code, mode_code = POSITION.unpack_from(data, offset)
+    masks_start = offset + POSITION.size
+
+    if player_code not in PLAYERS or mode_code not in MODES:
+        raise InvalidRecord
+
+    black = int.from_bytes(data[masks_start:masks_start + MASK_BYTES], 'little')
+    white = int.from_bytes(data[masks_start + MASK_BYTES:masks_start + 2*MASK_BYTES], 'little')
+    return (rows, col, black, white, PLAYERS[player_code], MODES[mode_code])
+
+
+def decode_game_state(data: bytes, offset: int = 0, board_type: type = None) -> "GameState":
+    '''
+    Builds a GameState holding the position stored at the given offset.
+    '''
+    rows, col, black, white, player, mode = decode_position(data, offset)
+    game = game_classes.GameState(game_classes.BLACK, mode, rows, col,
+                                  game_classes.BLACK, board_type)
+    game.load_position(black, white, player)
+    return game
+
+
+def encode_game(rows: int, col: int, first_to_move: int, top_left_center_disc: int,
+                winner_mode: str, moves: [int]) -> bytes:
+    '''
+    Packs a game record. Moves are given as row * col + column.
+    '''
+    return GAME_HEADER.pack(rows, col, PLAYER_CODES[first_to_move],
+                            PLAYER_CODES[top_left_center_disc], MODE_CODES[winner_mode],
+                            len(moves)) + bytes(moves)
+
+
+def decode_game(data: bytes, offset: int = 0) -> ((int, int, int, int, str, bytes), int):
+    '''
+    Unpacks the game record at the given offset. Returns the rows, columns,
+    first player, top-left center disc, winner mode and moves, along with
+    the offset of the next record. The moves are a bytes object of squares.
+    '''
+    rows, col, first_code, topleft_code, mode_code, no_of_moves = GAME_HEADER.unpack_from(data, offset)
+    moves_start = offset + GAME_HEADER.size
+    next_offset = moves_start + no_of_moves
+
+    if first_code not in (1, 2) or topleft_code not in (1, 2) or mode_code not in MODES \
+       or next_offset > len(data):
+        raise InvalidRecord
+
+    moves = bytes(data[moves_start:next_offset])
+    return ((rows, col, PLAYERS[first_code], PLAYERS[topleft_code], MODES[mode_code], moves),
+            next_offset)
+
+
+class MappedFile:
+    '''
+    A read-only memory map of a file. An empty file maps to empty bytes,
+    which mmap itself does not allow.
+    '''
+    def __init__(self, path: str) -> None:
+        self._file = open(path, 'rb')
+
+        try:
+            self.data = mmap.mmap(self._file.fileno(), 0, access = mmap.ACCESS_READ)
+        except ValueError:
+            self.data = b''
+
+    def close(self) -> None:
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+        self._file.close()
+
+    def __enter__(self) -> "MappedFile":
+        return self
+
+    def __exit__(self, *exception_info) -> None:
+        self.close()
+
+
+class PositionFile(MappedFile):
+    '''
+    A memory-mapped file of position records. Positions are decoded only
+    when they are read.
+    '''
+    def __len__(self) -> int:
+        return len(self.data) // POSITION_SIZE
+
+    def __getitem__(self, index: int) -> (int, int, int, int, int, str):
+        if not 0 <= index < len(self):
+            raise IndexError
+
+        return decode_position(self.data, index * POSITION_SIZE)
+
+    def __iter__(self) -> "Iterator":
+        for offset in range(0, len(self) * POSITION_SIZE, POSITION_SIZE):
+            yield decode_position(self.data, offset)
+
+
+class GameRecordFile(MappedFile):
+    '''
+    A memory-mapped file of game records, read one record at a time.
+    '''
+    def __iter__(self) -> "Iterator":
+        offset = 0
+
+        while offset < len(self.data):
+            record, offset = decode_game(self.data, offset)
+            yield record
+
+
+def replay_game(record: (int, int, int, int, str, bytes), board_type: type = None) -> "GameState":
+    '''
+    Plays a decoded game record through a GameState and returns it.
+    Raises InvalidMoveError at the first illegal move.
+    '''
+    rows, col, first, topleft, mode, moves = record
+    game = game_classes.GameState(first, mode, rows, col, topleft,
+                                  board_type or bitboard.BitBoard)
+
+    for square in moves:
+        if game.get_winner() is not None:
+            raise game_classes.InvalidMoveError
+
+        game.player_take_turn(*divmod(square, col))
+        game.next_player_turn()
+
+    return game
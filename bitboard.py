@@ -0,0 +1,470 @@
+import functools
+import game_classes
+import transposition
+from game_classes import EMPTY, BLACK, WHITE, InvalidMoveError, InvalidDiscColor
+
+
+# Bit i of a mask stands for the cell at row i//cols, column i%cols.
+# A 16x16 board needs 256 bits, which Python ints handle natively.
+
+
+class BoardGeometry:
+    '''
+    Holds the masks needed to shift a whole bitboard one step in any
+    of the eight directions for a particular number of rows and columns.
+    '''
+    def __init__(self, rows: int, col: int) -> None:
+        self.rows = rows
+        self.col = col
+        self.size = rows * col
+        self.full = (1 << self.size) - 1
+
+        first_col = 0
+        last_col = 0
+
+        for r in range(rows):
+            first_col |= 1 << (r * col)
+            last_col |= 1 << (r * col + col - 1)
+
+        # After a shift towards the east, anything landing in the first
+        # column has wrapped around from the previous row, and likewise
+        # for the last column after a shift towards the west.
+        not_first_col = self.full & ~first_col
+        not_last_col = self.full & ~last_col
+
+        # Each direction is (shift left?, shift amount, mask applied after the shift).
+        # The order matches game_classes.DIRECTIONS.
+        self.directions = ((False, col, self.full),              # north
+                           (True, col, self.full),               # south
+                           (True, 1, not_first_col),             # east
+                           (False, 1, not_last_col),             # west
+                           (False, col + 1, not_last_col),       # northwest
+                           (True, col - 1, not_last_col),        # southwest
+                           (False, col - 1, not_first_col),      # northeast
+                           (True, col + 1, not_first_col))       # southeast
+
+    def move_mask(self, own: int, opp: int) -> int:
+        '''
+        Returns a mask of every empty cell where the owner of the discs in
+        own could place a disc, using shift-and-mask flood fills through the
+        opponent's discs in each direction.
+        '''
+        empty = self.full & ~(own | opp)
+        moves = 0
+
+        for left, amount, mask in self.directions:
+            if left:
+                run = (own << amount) & mask & opp
+
+                while run:
+                    grown = run | ((run << amount) & mask & opp)
+
+                    if grown == run:
+                        break
+
+                    run = grown
+
+                moves |= (run << amount) & mask & empty
+            else:
+                run = (own >> amount) & mask & opp
+
+                while run:
+                    grown = run | ((run >> amount) & mask & opp)
+
+                    if grown == run:
+                        break
+
+                    run = grown
+
+                moves |= (run >> amount) & mask & empty
+
+        return moves
+
+    def frontier_mask(self, black: int, white: int) -> int:
+        '''
+        Returns a mask of the empty cells next to at least one disc.
+        '''
+        discs = black | white
+        neighbors = 0
+
+        for left, amount, mask in self.directions:
+            if left:
+                neighbors |= (discs << amount) & mask
+            else:
+                neighbors |= (discs >> amount) & mask
+
+        return neighbors & ~discs
+
+    def flip_mask(self, own: int, opp: int, square: int) -> int:
+        '''
+        Returns a mask of the opponent's discs which would be flipped if
+        the owner of own placed a disc on the given square. The mask is
+        zero if the move would flip nothing.
+        '''
+        flips = 0
+        bit = 1 << square
+
+        for left, amount, mask in self.directions:
+            run = 0
+
+            if left:
+                cursor = (bit << amount) & mask
+
+                while cursor & opp:
+                    run |= cursor
+                    cursor = (cursor << amount) & mask
+            else:
+                cursor = (bit >> amount) & mask
+
+                while cursor & opp:
+                    run |= cursor
+                    cursor = (cursor >> amount) & mask
+
+            if cursor & own:
+                flips |= run
+
+        return flips
+
+
+@functools.cache
+def board_geometry(rows: int, col: int) -> BoardGeometry:
+    '''
+    Returns the shared BoardGeometry for the given board dimensions,
+    building it the first time the dimensions are seen.
+    '''
+    return BoardGeometry(rows, col)
+
+
+def bits_of(mask: int) -> [int]:
+    '''
+    Returns the indices of the set bits in a mask, lowest first.
+    '''
+    squares = []
+
+    while mask:
+        low_bit = mask & -mask
+        squares.append(low_bit.bit_length() - 1)
+        mask ^= low_bit
+
+    return squares
+
+
+class BitBoard:
+    '''
+    A GameBoard that stores the discs as two bitmasks instead of a grid
+    of Cells. It has the same interface as GameBoard and can be handed to
+    GameState as its board type.
+    '''
+    def __init__(self, rows: int, col: int, top_left_center_disc: int) -> None:
+        '''
+        Set up the game board.
+        '''
+        self._no_of_rows = rows
+        self._no_of_col = col
+        self._geometry = board_geometry(rows, col)
+        self._black = 0
+        self._white = 0
+        self._flip_cache = {}           # Color -> {square: flip mask} for the current position
+        self._legal_moves_cache = {}    # Color -> legal moves in GameBoard's format
+        self._undo_stack = []           # Board before each apply_move, most recent last
+        self._listeners = []            # Told about every disc placed, flipped or removed
+
+        # Place the first four discs, matching GameBoard.
+        top = rows // 2 - 1
+        left = col // 2 - 1
+        same = (1 << (top * col + left)) | (1 << ((top + 1) * col + left + 1))
+        other = (1 << ((top + 1) * col + left)) | (1 << (top * col + left + 1))
+
+        if top_left_center_disc == BLACK:
+            self._black, self._white = same, other
+        elif top_left_center_disc == WHITE:
+            self._black, self._white = other, same
+        else:
+            raise InvalidMoveError
+
+        self._zobrist = transposition.zobrist_keys(rows, col)
+        self._hash = self._zobrist.hash_of(self._black, self._white)
+
+    def get_rows_of_cells(self) -> [["Cell"]]:
+        '''
+        Returns the rows of the gameboard as freshly built Cells. Unlike
+        GameBoard's, they are a snapshot: they do not follow later moves,
+        and changing them does not change the board.
+        '''
+        rows = []
+
+        for r in range(self._no_of_rows):
+            row = []
+
+            for c in range(self._no_of_col):
+                cell = game_classes.Cell()
+                color = self.cell_content(r, c)
+
+                if color != EMPTY:
+                    cell.place_disc(color)
+
+                row.append(cell)
+
+            rows.append(row)
+
+        return rows
+
+    def cell_content(self, row_index: int, col_index: int) -> int:
+        '''
+        Gives back the contents of the cell at the given address.
+        '''
+        bit = 1 << (row_index * self._no_of_col + col_index)
+
+        if self._black & bit:
+            return BLACK
+        elif self._white & bit:
+            return WHITE
+        else:
+            return EMPTY
+
+    def to_string(self) -> str:
+        '''
+        Gives a string resembling the game board.
+        '''
+        symbols = {EMPTY: '.', BLACK: 'B', WHITE: 'W'}
+
+        return "\n".join("".join(symbols[self.cell_content(r, c)] + " "
+                                 for c in range(self._no_of_col))
+                         for r in range(self._no_of_rows))
+
+    def is_full(self) -> bool:
+        '''
+        Returns whether or not every cell in the BitBoard is full.
+        '''
+        return (self._black | self._white) == self._geometry.full
+
+    def no_of_white_discs(self):
+        '''
+        Returns the number of white discs.
+        '''
+        return self._white.bit_count()
+
+    def no_of_black_discs(self):
+        '''
+        Returns the number of black discs.
+        '''
+        return self._black.bit_count()
+
+    def disc_masks(self) -> (int):
+        '''
+        Returns a pair of bitmasks of the black discs and the white discs.
+        '''
+        return (self._black, self._white)
+
+    def load_masks(self, black: int, white: int) -> None:
+        '''
+        Replaces every disc on the board with the discs in the given
+        bitmasks. Cached moves and the undo history are dropped.
+        '''
+        if black & white or (black | white) & ~self._geometry.full:
+            raise game_classes.InvalidCellContents
+
+        self._black = black
+        self._white = white
+        self._hash = self._zobrist.hash_of(black, white)
+        self._flip_cache = {}
+        self._legal_moves_cache = {}
+        self._undo_stack = []
+
+        for listener in self._listeners:
+            listener.board_loaded(black, white)
+
+    def add_listener(self, listener: object) -> None:
+        '''
+        Has the listener told about every change to the discs, with the
+        same calls as GameBoard.add_listener.
+        '''
+        self._listeners.append(listener)
+
+    def zobrist_hash(self) -> int:
+        '''
+        Returns the Zobrist hash of the discs on the board.
+        '''
+        return self._hash
+
+    def frontier(self) -> {(int)}:
+        '''
+        Returns the (row, col) addresses of the empty cells next to at
+        least one disc, which are the only cells where a move can be legal.
+        '''
+        return {divmod(square, self._no_of_col)
+                for square in bits_of(self._geometry.frontier_mask(self._black, self._white))}
+
+    def no_of_rows(self):
+        '''
+        Returns the gameboard's number of rows.
+        '''
+        return self._no_of_rows
+
+    def no_of_col(self):
+        '''
+        Returns the gameboard's number of columns.
+        '''
+        return self._no_of_col
+
+    def no_moves(self, color: int) -> bool:
+        '''
+        See if there are no valid moves on the board
+        for a particular color.
+        '''
+        return len(self._flip_masks(color)) == 0
+
+    def legal_moves(self, color: int) -> {(int): ((int))}:
+        '''
+        Returns every valid move for a particular color, mapping each
+        move's (row, col) address to a tuple of the (row, col) addresses
+        of the discs it would flip. It is cached until the next disc is
+        placed, so it should not be changed by the caller.
+        '''
+        if color in self._legal_moves_cache:
+            return self._legal_moves_cache[color]
+
+        col = self._no_of_col
+        moves = {}
+
+        for square, flips in self._flip_masks(color).items():
+            moves[divmod(square, col)] = tuple(divmod(flipped, col) for flipped in bits_of(flips))
+
+        self._legal_moves_cache[color] = moves
+        return moves
+
+    def apply_move(self, row_index: int, col_index: int, color: int) -> None:
+        '''
+        Makes a move like place_disc, but remembers the board before it so
+        that undo_move can take it back. Raises InvalidMoveError if the
+        move would not flip anything.
+        '''
+        square = row_index * self._no_of_col + col_index
+        own, opp = self._own_and_opp(color)
+        known_moves = self._flip_cache.get(color)
+
+        if known_moves is not None:
+            flips = known_moves.get(square, 0)
+        elif (own | opp) >> square & 1:
+            flips = 0
+        else:
+            flips = self._geometry.flip_mask(own, opp, square)
+
+        if flips == 0:
+            raise InvalidMoveError
+
+        self._undo_stack.append((self._black, self._white, self._hash,
+                                 self._flip_cache, self._legal_moves_cache, square, color, flips))
+        self._make_move(square, color, flips)
+
+    def undo_move(self) -> None:
+        '''
+        Takes back the last move made by apply_move.
+        '''
+        (self._black, self._white, self._hash, self._flip_cache,
+         self._legal_moves_cache, square, color, flips) = self._undo_stack.pop()
+
+        if self._listeners:
+            flipped = bits_of(flips)
+
+            for listener in self._listeners:
+                listener.discs_flipped(flipped, -color)
+                listener.disc_removed(square, color)
+
+    def _flip_masks(self, color: int) -> {int: int}:
+        '''
+        Returns every valid move for a particular color as a dictionary
+        from square index to the mask of discs it would flip.
+        '''
+        if color in self._flip_cache:
+            return self._flip_cache[color]
+
+        own, opp = self._own_and_opp(color)
+        flip_mask = self._geometry.flip_mask
+        masks = {}
+
+        for square in bits_of(self._geometry.move_mask(own, opp)):
+            masks[square] = flip_mask(own, opp, square)
+
+        self._flip_cache[color] = masks
+        return masks
+
+    def valid_move(self, row_index: int, col_index: int, color: int) -> bool:
+        '''
+        Placing a disc is valid only if it will flip a series of
+        bounded discs in at least one direction AND only if the cell is
+        empty.
+        '''
+        square = row_index * self._no_of_col + col_index
+
+        if color in self._flip_cache:
+            return square in self._flip_cache[color]
+
+        if (self._black | self._white) >> square & 1:
+            return False
+
+        own, opp = self._own_and_opp(color)
+        return self._geometry.flip_mask(own, opp, square) != 0
+
+    def place_disc(self, row_index: int, col_index: int, color: int) -> None:
+        '''
+        Places a disc at the specified cell and flips the bounded discs.
+        Raises InvalidMoveError if the cell is already full.
+        '''
+        square = row_index * self._no_of_col + col_index
+        bit = 1 << square
+
+        if (self._black | self._white) & bit:
+            raise InvalidMoveError
+
+        own, opp = self._own_and_opp(color)
+        known_moves = self._flip_cache.get(color)
+
+        if known_moves is not None and square in known_moves:
+            flips = known_moves[square]
+        else:
+            flips = self._geometry.flip_mask(own, opp, square)
+
+        self._make_move(square, color, flips)
+
+    def _make_move(self, square: int, color: int, flips: int) -> None:
+        '''
+        Puts a disc of the given color on an empty square, flips the discs
+        in flips and brings the hash and caches up to date.
+        '''
+        own, opp = self._own_and_opp(color)
+        bit = 1 << square
+
+        if color == BLACK:
+            self._black = own | bit | flips
+            self._white = opp & ~flips
+            self._hash ^= self._zobrist.black[square]
+        else:
+            self._white = own | bit | flips
+            self._black = opp & ~flips
+            self._hash ^= self._zobrist.white[square]
+
+        flip_keys = self._zobrist.flip
+
+        flipped = bits_of(flips)
+
+        for index in flipped:
+            self._hash ^= flip_keys[index]
+
+        self._flip_cache = {}
+        self._legal_moves_cache = {}
+
+        for listener in self._listeners:
+            listener.disc_placed(square, color)
+            listener.discs_flipped(flipped, color)
+
+    def _own_and_opp(self, color: int) -> (int):
+        '''
+        Returns the masks of the given color's discs and its opponent's discs.
+        '''
+        if color == BLACK:
+            return (self._black, self._white)
+        elif color == WHITE:
+            return (self._white, self._black)
+        else:
+            raise InvalidDiscColor
@@ -3,6 +3,8 @@ import math
 
 
 class Point:
+    __slots__ = ('_fract_x', '_fract_y')
+
     def __init__(self, x_px: int, y_px: int, width: int, height: int) -> None:
         '''
         Creates a point with coordinates stored as fractional distances
@@ -11,6 +13,16 @@ class Point:
         self._fract_x = x_px/width
         self._fract_y = y_px/height
 
+    @classmethod
+    def from_fract(cls, fract_x: float, fract_y: float) -> "Point":
+        '''
+        Creates a point straight from its fractional coordinates.
+        '''
+        point = cls.__new__(cls)
+        point._fract_x = fract_x
+        point._fract_y = fract_y
+        return point
+
     def fract_coord(self) -> (float):
         '''
         Returns a tuple of the coordinates in fractional form.
@@ -31,16 +43,12 @@ class Point:
         Considers them equivalent if their x and y fractional
         coordinates are equal.
         '''
-        other_point_coord = other_point.fract_coord()
-
-        if self._fract_x == other_point_coord[0] \
-           and self._fract_y == other_point_coord[1]:
-            return True
-        else:
-            return False
+        return self._fract_x == other_point._fract_x and self._fract_y == other_point._fract_y
 
 
 class Circle:
+    __slots__ = ('p1', 'p2', 'color')
+
     def __init__(self, p1: "Point", p2: "Point", color: str) -> None:
         '''
         Creates a circle/oval with two opposite corner points representing
@@ -82,6 +90,8 @@ class Circle:
 
 
 class Rectangle:
+    __slots__ = ('p1', 'p2', 'color', 'border_color')
+
     def __init__(self, p1: "Point", p2: "Point") -> None:
         '''
         Creates a rectangle withe two opposite corner points.
@@ -115,48 +125,74 @@ class Rectangle:
         Given a point, this will see if the rectangle contains
         the point.
         '''
-        p1_coord = self.p1.fract_coord()
-        p2_coord = self.p2.fract_coord()
-        point_coord = point.fract_coord()
+        x1, x2 = self.p1._fract_x, self.p2._fract_x
+        y1, y2 = self.p1._fract_y, self.p2._fract_y
+        x, y = point._fract_x, point._fract_y
 
-        if ((point_coord[0] > p1_coord[0] and point_coord[0] < p2_coord[0]) \
-            or (point_coord[0] < p1_coord[0] and point_coord[0] > p2_coord[0])) \
-            and ((point_coord[1] > p1_coord[1] and point_coord[1] < p2_coord[1]) \
-            or (point_coord[1] < p1_coord[1] and point_coord[1] > p2_coord[1])):
+        return (x1 < x < x2 or x2 < x < x1) and (y1 < y < y2 or y2 < y < y1)
 
-            return True
 
-        else:
-            return False
+class GridIndex:
+    def __init__(self, no_of_rows: int, no_of_col: int) -> None:
+        '''
+        Maps points to the cells of a grid of equal rectangles which covers
+        the whole 2D area, the same way at any width and height.
+        '''
+        self._no_of_rows = no_of_rows
+        self._no_of_col = no_of_col
+
+    def cell_at(self, point: "Point") -> (int):
+        '''
+        Returns the (row, col) address of the cell containing the point,
+        or None if the point is outside the area. A point on a line between
+        cells belongs to the cell below or to the right of the line, and a
+        point on the far edge of the area belongs to the last cell.
+        '''
+        fract_x, fract_y = point.fract_coord()
+
+        if fract_x < 0 or fract_x > 1 or fract_y < 0 or fract_y > 1:
+            return None
+
+        # The small allowance keeps points exactly on a grid line from
+        # being rounded down into the previous cell.
+        row_index = min(int(fract_y*self._no_of_rows + 1e-9), self._no_of_rows - 1)
+        col_index = min(int(fract_x*self._no_of_col + 1e-9), self._no_of_col - 1)
+        return (row_index, col_index)
 
 
 class CircleState:
     def __init__(self) -> None:
         '''
-        Keeps a list of all the circles in existence.
+        Keeps all the circles in existence, each keyed by the
+        (row, col) grid coordinates of the cell it sits in.
         '''
-        self.circles = []
+        self.circles = {}
 
     def all_circles(self) -> ["Circle"]:
         '''
         Returns a list of all the existing circles.
         '''
-        return self.circles
+        return list(self.circles.values())
+
+    def circle_at(self, grid_coord: (int)) -> "Circle":
+        '''
+        Returns the circle at the given grid coordinates, or None
+        if there is none.
+        '''
+        return self.circles.get(grid_coord)
 
-    def append_circle(self, new_circle: "Circle") -> None:
+    def put_circle(self, grid_coord: (int), new_circle: "Circle") -> None:
         '''
-        Adds a new circle to the list of circles in existence.
+        Puts a circle at the given grid coordinates, replacing any
+        circle already there.
         '''
-        self.circles.append(new_circle)
+        self.circles[grid_coord] = new_circle
 
-    def remove_circle(self, unwanted_circle: "Circle") -> None:
+    def remove_circle(self, grid_coord: (int)) -> None:
         '''
-        Takes a circle and removes any equivalent circles from
-        the list of circles in existence.
+        Removes the circle at the given grid coordinates, if any.
         '''
-        for circle in self.circles:
-            if circle.equals(unwanted_circle):
-                circles.remove(circle)
+        self.circles.pop(grid_coord, None)
 
 
 class RectangleState:
@@ -166,6 +202,22 @@ class RectangleState:
         '''
         self.rectangles = []
 
+    @classmethod
+    def grid(cls, no_of_rows: int, no_of_col: int) -> "RectangleState":
+        '''
+        Creates the rectangles of a grid of equal cells covering the
+        whole 2D area, listed row by row. Neighboring cells share their
+        corner points, so only (rows + 1) * (columns + 1) points are made.
+        '''
+        corners = [[Point.from_fract(col_index/no_of_col, row_index/no_of_rows)
+                    for col_index in range(no_of_col + 1)]
+                   for row_index in range(no_of_rows + 1)]
+        rectangle_state = cls()
+        rectangle_state.rectangles = [Rectangle(top[col_index], bottom[col_index + 1])
+                                      for top, bottom in zip(corners, corners[1:])
+                                      for col_index in range(no_of_col)]
+        return rectangle_state
+
     def append_rect(self, new_rect: "Rectangle") -> None:
         '''
         Adds a new rectangle to the list of rectangles in existence.
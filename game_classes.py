@@ -2,13 +2,26 @@
 # 96124542
 
 
+import array
+import functools
 import math
+import transposition
 
 
 EMPTY = 0
 BLACK = 1
 WHITE = -1
 
+# (row step, column step) of the eight directions: north, south, east, west,
+# northwest, southwest, northeast and southeast.
+DIRECTIONS = ((-1, 0), (1, 0), (0, 1), (0, -1), (-1, -1), (1, -1), (-1, 1), (1, 1))
+
+# The letters standing for the colors in game records and on command lines,
+# and the winner modes.
+COLORS = {'B': BLACK, 'W': WHITE}
+COLOR_NAMES = {BLACK: 'B', WHITE: 'W', EMPTY: '-'}
+WINNER_MODES = ('>', '<')
+
 
 class InvalidMoveError(Exception):
     pass
@@ -31,11 +44,23 @@ class GameState:
     Memorizes and manipulates the state of the Othello game.
     '''
     def __init__(self, first_to_move: int, winner_mode: int, rows: int,
-                 col: int, top_left_center_disc: int) -> None:
+                 col: int, top_left_center_disc: int, board_type: type = None) -> None:
+        '''
+        Sets up a new game. The board is a GameBoard unless another board
+        type with the same interface, such as bitboard.BitBoard, is given.
+        A BitBoard's get_rows_of_cells returns a snapshot of the board
+        rather than the live Cells, so callers which keep the rows, such as
+        the GUI, need a GameBoard.
+        '''
+        if board_type is None:
+            board_type = GameBoard
+
         self._player_making_move = first_to_move
         self._winner_mode = winner_mode
         self._winner = None
-        self._gameboard = GameBoard(rows, col, top_left_center_disc)
+        self._gameboard = board_type(rows, col, top_left_center_disc)
+        self._undo_stack = []       # (player to move, winner, changes) before each apply_move
+        self._last_move_changes = ()
 
     def to_string(self) -> str:
         '''
@@ -53,11 +78,53 @@ class GameState:
         Places a disc at the given cell address. The disc matches the
         player whose turn it is. 
         '''
-        if self._gameboard.valid_move(row_index, col_index, self._player_making_move):
+        moves = self.legal_moves()
+
+        if (row_index, col_index) in moves:
+            self._last_move_changes = ((row_index, col_index),) + moves[(row_index, col_index)]
             self._gameboard.place_disc(row_index, col_index, self._player_making_move)
         else:
             raise InvalidMoveError
 
+    def apply_move(self, row_index: int, col_index: int) -> None:
+        '''
+        Plays a move for the player whose turn it is and passes the turn on,
+        like player_take_turn followed by next_player_turn. The move can be
+        taken back with undo_move.
+        '''
+        moves = self.legal_moves()
+
+        if (row_index, col_index) not in moves:
+            raise InvalidMoveError
+
+        changes = ((row_index, col_index),) + moves[(row_index, col_index)]
+        self._gameboard.apply_move(row_index, col_index, self._player_making_move)
+        self._undo_stack.append((self._player_making_move, self._winner, changes))
+        self._last_move_changes = changes
+        self.next_player_turn()
+
+    def load_position(self, black: int, white: int, player_making_move: int) -> None:
+        '''
+        Sets the discs from a pair of bitmasks and hands the turn to the
+        given player. If the player is None, the game is over and the
+        winner is determined.
+        '''
+        self._gameboard.load_masks(black, white)
+        self._player_making_move = player_making_move
+        self._winner = None
+        self._undo_stack = []
+        self._last_move_changes = ()
+
+        if player_making_move is None:
+            self._determine_winner()
+
+    def undo_move(self) -> None:
+        '''
+        Takes back the last move made by apply_move.
+        '''
+        self._gameboard.undo_move()
+        self._player_making_move, self._winner, self._last_move_changes = self._undo_stack.pop()
+
     def next_player_turn(self):
         '''
         Determines who moves next. Invokes the _determine_winner method
@@ -71,6 +138,24 @@ class GameState:
             self._player_making_move = None
             self._determine_winner()
 
+    def legal_moves(self) -> {(int): ((int))}:
+        '''
+        Returns the legal moves of the player whose turn it is, mapped to
+        the addresses of the discs each would flip. There are none once
+        the game is over.
+        '''
+        if self._player_making_move is None:
+            return {}
+
+        return self._gameboard.legal_moves(self._player_making_move)
+
+    def last_move_changes(self) -> ((int)):
+        '''
+        Returns the (row, col) addresses of the cells changed by the last
+        move or undo: the placed disc first, then the flipped discs.
+        '''
+        return self._last_move_changes
+
     def get_rows_of_cells(self) -> [["Cells"]]:
         return self._gameboard.get_rows_of_cells()
 
@@ -92,6 +177,22 @@ class GameState:
     def player_making_move(self):
         return self._player_making_move
 
+    def winner_mode(self):
+        return self._winner_mode
+
+    def disc_masks(self) -> (int):
+        return self._gameboard.disc_masks()
+
+    def zobrist_hash(self) -> int:
+        '''
+        Returns the Zobrist hash of the position, including whose turn it is.
+        '''
+        if self._player_making_move == WHITE:
+            keys = transposition.zobrist_keys(self.no_of_rows(), self.no_of_col())
+            return self._gameboard.zobrist_hash() ^ keys.side_to_move
+
+        return self._gameboard.zobrist_hash()
+
     def player_to_string(player_index: int):
         '''
         Converts a player's index to a string.
@@ -142,12 +243,14 @@ class GameBoard:
         self._no_of_rows = rows
         self._no_of_col = col        
         self._rows = []
+        self._legal_moves_cache = {}     # Color -> legal moves for the current position
+        self._undo_stack = []            # Moves made by apply_move, most recent last
+        self._listeners = []             # Told about every disc placed, flipped or removed
 
-        # A list of functions giving the addresses of neighboring cells.
-        self.neighbor_functions = [GameBoard._north_cell, GameBoard._south_cell, GameBoard._east_cell,
-                      GameBoard._west_cell, GameBoard._northwest_cell,
-                      GameBoard._southwest_cell, GameBoard._northeast_cell,
-                      GameBoard._southeast_cell]        
+        # The neighbors and rays of every cell, shared by all boards of this size.
+        tables = board_tables(rows, col)
+        self._neighbors = tables.neighbors
+        self._rays = tables.rays
 
         # Create the rows and columns.
         for r in range(rows):
@@ -158,12 +261,26 @@ class GameBoard:
 
             self._rows.append(row)
 
+        # The same cells in one flat list, indexed by row * col + column.
+        self._cells = [cell for row in self._rows for cell in row]
+
         # Place the first four discs. Do not use the place disc method.
         self._rows[math.floor(rows/2) - 1][math.floor(col/2) - 1].place_disc(top_left_center_disc)
         self._rows[math.floor(rows/2)][math.floor(col/2)].place_disc(top_left_center_disc)
         self._rows[math.floor(rows/2)][math.floor(col/2) - 1].place_disc(top_left_center_disc * -1)
         self._rows[math.floor(rows/2) - 1][math.floor(col/2)].place_disc(top_left_center_disc * -1)        
 
+        # The Zobrist hash of the discs on the board, kept up to date
+        # by place_disc and the flipping methods.
+        self._zobrist = transposition.zobrist_keys(rows, col)
+        self._hash = self._zobrist.hash_of(*self.disc_masks())
+
+        # The indices of the empty cells next to at least one disc. Only
+        # these can be legal moves, so move generation looks nowhere else.
+        # Flipping never changes which cells are empty, so only placing and
+        # removing discs changes the frontier.
+        self._frontier = self._frontier_of_board()
+
     def get_rows_of_cells(self) -> [["Cell"]]:
         '''
         Returns the rows of the gameboard's cells.
@@ -174,26 +291,14 @@ class GameBoard:
         '''
         Gives a string resembling the game board.
         '''
-        gameboard_as_str = ""
-
-        for row in self._rows:
-            for cell in row:
-                gameboard_as_str += cell.to_string() + " "
-
-            gameboard_as_str += "\n"
-
-        return gameboard_as_str[:-1]
+        return "\n".join("".join([cell.to_string() + " " for cell in row])
+                         for row in self._rows)
 
     def is_full(self) -> bool:
         '''
         Returns whether or not every cell in the GameBoard is full.
         '''
-        for row in self._rows:
-            for cell in row:
-                if cell.cell_content() == EMPTY:
-                    return False
-
-        return True
+        return self._black_discs.get_count() + self._white_discs.get_count() == len(self._cells)
 
     def no_of_white_discs(self):
         '''
@@ -207,6 +312,72 @@ class GameBoard:
         '''
         return self._black_discs.get_count()
 
+    def disc_masks(self) -> (int):
+        '''
+        Returns a pair of bitmasks of the black discs and the white discs.
+        Bit row * col + column stands for the cell at that address.
+        '''
+        black = 0
+        white = 0
+
+        for index, cell in enumerate(self._cells):
+            if cell.cell_content() == BLACK:
+                black |= 1 << index
+            elif cell.cell_content() == WHITE:
+                white |= 1 << index
+
+        return (black, white)
+
+    def load_masks(self, black: int, white: int) -> None:
+        '''
+        Replaces every disc on the board with the discs in the given
+        bitmasks. Cached moves and the undo history are dropped.
+        '''
+        if black & white or (black | white) >> len(self._cells):
+            raise InvalidCellContents
+
+        for index, cell in enumerate(self._cells):
+            if cell.cell_content() != EMPTY:
+                cell.remove_disc()
+
+            if black >> index & 1:
+                cell.place_disc(BLACK)
+            elif white >> index & 1:
+                cell.place_disc(WHITE)
+
+        self._black_discs = Counter(black.bit_count())
+        self._white_discs = Counter(white.bit_count())
+        self._hash = self._zobrist.hash_of(black, white)
+        self._legal_moves_cache = {}
+        self._undo_stack = []
+        self._frontier = self._frontier_of_board()
+
+        for listener in self._listeners:
+            listener.board_loaded(black, white)
+
+    def add_listener(self, listener: object) -> None:
+        '''
+        Has the listener told about every change to the discs. It is sent
+        disc_placed(index, color) and disc_removed(index, color) for a disc
+        put in or taken out of the cell at index row * col + column,
+        discs_flipped(indices, color) with the new color of flipped discs,
+        and board_loaded(black, white) with the masks given to load_masks.
+        '''
+        self._listeners.append(listener)
+
+    def zobrist_hash(self) -> int:
+        '''
+        Returns the Zobrist hash of the discs on the board.
+        '''
+        return self._hash
+
+    def frontier(self) -> {(int)}:
+        '''
+        Returns the (row, col) addresses of the empty cells next to at
+        least one disc, which are the only cells where a move can be legal.
+        '''
+        return {divmod(index, self._no_of_col) for index in self._frontier}
+
     def no_of_rows(self):
         '''
         Returns the gameboard's number of rows.
@@ -224,12 +395,34 @@ class GameBoard:
         See if there are no valid moves on the board
         for a particular color.
         '''
-        for row_index in range(self._no_of_rows):
-            for cell_index in range(self._no_of_col):
-                if self.valid_move(row_index, cell_index, color):                    
-                    return False
+        return len(self.legal_moves(color)) == 0
+
+    def legal_moves(self, color: int) -> {(int): ((int))}:
+        '''
+        Returns every valid move for a particular color, found in one
+        pass over the board. The result maps each move's (row, col) address
+        to a tuple of the (row, col) addresses of the discs it would flip.
+        It is cached until the next disc is placed, so it should not be
+        changed by the caller.
+        '''
+        if color in self._legal_moves_cache:
+            return self._legal_moves_cache[color]
+
+        if color != BLACK and color != WHITE:
+            raise InvalidDiscColor
+
+        moves = {}
+
+        # Sorting keeps the moves in row-major order, as a scan of the whole board would.
+        for index in sorted(self._frontier):
+            row_index, col_index = divmod(index, self._no_of_col)
+            flips = self._addresses_of_bounded_discs(color, row_index, col_index)
 
-        return True
+            if flips:
+                moves[(row_index, col_index)] = flips
+
+        self._legal_moves_cache[color] = moves
+        return moves
                 
     def valid_move(self, row_index: int, col_index: int, color: int) -> bool:
         '''
@@ -237,35 +430,22 @@ class GameBoard:
         bounded discs in at least one direction AND only if the cell is
         empty.
         '''
-        if self._rows[row_index][col_index].cell_content() == EMPTY:
-            bounded_discs_exist = []
-
-            # Make a list of whether or not the prospective
-            # move would flip a series of discs in each given
-            # direction.
-            for neighbor_funct in self.neighbor_functions:
-                try:
-                    cells_of_flippable_discs = self._cells_of_bounded_discs(color, neighbor_funct,
-                                                                            row_index, col_index)
-                except InvalidMoveError:
-                    bounded_discs_exist.append(False)
-                except IndexError:
-                    bounded_discs_exist.append(False)
-                else:
-                    if cells_of_flippable_discs == []:
-                        bounded_discs_exist.append(False)
-                    else:
-                        bounded_discs_exist.append(True)
-
-            # See if the prospective move would flip any
-            # bounded discs.
-            if True in bounded_discs_exist:
-                return True
-            else:
-                return False
-        else:
+        if color in self._legal_moves_cache:
+            return (row_index, col_index) in self._legal_moves_cache[color]
+
+        index = row_index * self._no_of_col + col_index
+
+        if index not in self._frontier:
             return False
 
+        # The move is valid as soon as one direction would
+        # flip a series of discs.
+        for ray in self._rays[index]:
+            if self._cells_of_bounded_discs(color, ray):
+                return True
+
+        return False
+
     def place_disc(self, row_index: int, col_index: int, color: int) -> None:
         '''
         Places a disc at the specified cell. The disc color is
@@ -274,16 +454,131 @@ class GameBoard:
         will catch that. Once a disc is placed, bounded discs
         will be flipped.
         '''
+        known_moves = self._legal_moves_cache.get(color)
+        self._put_disc(row_index, col_index, color)
+
+        if known_moves is not None and (row_index, col_index) in known_moves:
+            # The flips were already found by legal_moves.
+            self._flip_discs_at(color, known_moves[(row_index, col_index)])
+        else:
+            self._flip_bounded_discs(color, row_index, col_index)
+
+        self._legal_moves_cache = {}
+
+    def apply_move(self, row_index: int, col_index: int, color: int) -> None:
+        '''
+        Makes a move like place_disc, but remembers what it changed so that
+        undo_move can take it back. Raises InvalidMoveError if the move
+        would not flip anything.
+        '''
+        known_moves = self._legal_moves_cache.get(color)
+
+        if known_moves is not None:
+            flips = known_moves.get((row_index, col_index), ())
+        elif self._rows[row_index][col_index].cell_content() == EMPTY:
+            flips = self._addresses_of_bounded_discs(color, row_index, col_index)
+        else:
+            flips = ()
+
+        if not flips:
+            raise InvalidMoveError
+
+        added_to_frontier = self._put_disc(row_index, col_index, color)
+        self._flip_discs_at(color, flips)
+        self._undo_stack.append((row_index, col_index, color, flips, self._legal_moves_cache,
+                                 added_to_frontier))
+        self._legal_moves_cache = {}
+
+    def undo_move(self) -> None:
+        '''
+        Takes back the last move made by apply_move, restoring the discs,
+        the disc counts, the hash and the cached legal moves.
+        '''
+        row_index, col_index, color, flips, legal_moves, added_to_frontier = self._undo_stack.pop()
+        self._flip_discs_at(-color, flips)
+        self._rows[row_index][col_index].remove_disc()
+
+        # The cell was a legal move, so it was on the frontier before.
+        self._frontier.difference_update(added_to_frontier)
+        self._frontier.add(row_index * self._no_of_col + col_index)
+
+        for listener in self._listeners:
+            listener.disc_removed(row_index * self._no_of_col + col_index, color)
+
+        if color == BLACK:
+            self._black_discs.decrement()
+            self._hash ^= self._zobrist.black[row_index * self._no_of_col + col_index]
+        else:
+            self._white_discs.decrement()
+            self._hash ^= self._zobrist.white[row_index * self._no_of_col + col_index]
+
+        self._legal_moves_cache = legal_moves
+
+    def _put_disc(self, row_index: int, col_index: int, color: int) -> [int]:
+        '''
+        Puts a disc in an empty cell and counts it, without flipping anything.
+        Returns the indices of the cells which this added to the frontier.
+        '''
         if(color == BLACK):
             self._rows[row_index][col_index].place_disc(color)
             self._black_discs.increment()
+            self._hash ^= self._zobrist.black[row_index * self._no_of_col + col_index]
         elif(color == WHITE):
             self._rows[row_index][col_index].place_disc(color)
             self._white_discs.increment()
+            self._hash ^= self._zobrist.white[row_index * self._no_of_col + col_index]
         else:
             raise InvalidDiscColor
 
-        self._flip_bounded_discs(color, row_index, col_index)
+        for listener in self._listeners:
+            listener.disc_placed(row_index * self._no_of_col + col_index, color)
+
+        index = row_index * self._no_of_col + col_index
+        frontier = self._frontier
+        cells = self._cells
+        added = [neighbor for neighbor in self._neighbors[index]
+                 if neighbor not in frontier and cells[neighbor].cell_content() == EMPTY]
+        frontier.discard(index)
+        frontier.update(added)
+        return added
+
+    def _flip_discs_at(self, color: int, addresses: ((int))) -> None:
+        '''
+        Flips the discs at the given (row, col) addresses to the given
+        color and updates the disc counts.
+        '''
+        flip_keys = self._zobrist.flip
+
+        for flip_row, flip_col in addresses:
+            self._rows[flip_row][flip_col].switch_cell_disc_color()
+            self._hash ^= flip_keys[flip_row * self._no_of_col + flip_col]
+
+        if color == WHITE:
+            self._white_discs.add(len(addresses))
+            self._black_discs.add(-len(addresses))
+        else:
+            self._black_discs.add(len(addresses))
+            self._white_discs.add(-len(addresses))
+
+        if self._listeners:
+            indices = [flip_row * self._no_of_col + flip_col for flip_row, flip_col in addresses]
+
+            for listener in self._listeners:
+                listener.discs_flipped(indices, color)
+
+    def _addresses_of_bounded_discs(self, color: int, row_index: int,
+                                    col_index: int) -> ((int)):
+        '''
+        Returns the (row, col) addresses of all the discs which a disc of the
+        given color placed at the given position would flip.
+        '''
+        addresses = []
+
+        for ray in self._rays[row_index * self._no_of_col + col_index]:
+            for index in self._cells_of_bounded_discs(color, ray):
+                addresses.append(divmod(index, self._no_of_col))
+
+        return tuple(addresses)
 
     def _flip_bounded_discs(self, color: int,
                            row_index: int, col_index: int) -> None:
@@ -292,104 +587,143 @@ class GameBoard:
         position and a corresponding one in any direction. If there are no
         bounded discs, then nothing will be flipped.
         '''
-        series_of_cells_with_discs = []
-        
-        for neighbor_funct in self.neighbor_functions:
-            try:
-                series_of_cells_with_discs.append(self._cells_of_bounded_discs(color,
-                                        neighbor_funct, row_index, col_index))
-
-            # The following errors are expected to possibly arise.
-            # Nothing needs to be done about those.
-            except IndexError:
-                pass
-            except InvalidMoveError:
-                pass
-
-        for cells_of_discs_to_flip in series_of_cells_with_discs:            
-            for cell in cells_of_discs_to_flip:
-                cell.switch_cell_disc_color()
-
-                if color == WHITE:
-                    self._white_discs.increment()
-                    self._black_discs.decrement()
-                elif color == BLACK:
-                    self._black_discs.increment()
-                    self._white_discs.decrement()
-                else:
-                    raise InvalidDiscColor
-        
-    def _cells_of_bounded_discs(self, color: int, neighbor_formula: "Function",
-                                row_index: int, col_index: int) -> ["Cell"]:
-        '''
-        This takes a disc color the user wants to place at the given position.
-        It then returns a list of the discs of the opposite color which
-        would be bounded between the disc at this position and a corresponding
-        disc in the given direction. There may be zero bounded discs. If there
-        is not corresponding disc in the given direction, there will be either and
-        IndexError or and InvalidMoveError.
-        '''
-        cells_with_discs = []       # Bounded discs we have found thus far
-        neighbor_row_index, neighbor_col_index = neighbor_formula(row_index, col_index)     # Neighboring cell's address
-
-        # For our purposes, there should be no negative indices.
-        # Python will not catch that, so we need to raise an IndexError
-        # if an index is negative.
-        if neighbor_row_index < 0 or neighbor_col_index < 0:
-            raise IndexError
-        
-        neighboring_cell = self._rows[neighbor_row_index][neighbor_col_index]   # Neighboring cell
+        if color != BLACK and color != WHITE:
+            raise InvalidDiscColor
 
-        # If the next cell's disc's color is the opposite of our
-        # original disc color, the cell has one of the bounded discs.
-        if neighboring_cell.cell_content() == color*-1:            
-            cells_with_discs.append(neighboring_cell)
+        cells = self._cells
+        flip_keys = self._zobrist.flip
+        flipped = []
 
-            # Go on to see if the next cell in the same direction
-            # also has a bounded disc.
-            cells_with_discs += self._cells_of_bounded_discs(color, neighbor_formula, neighbor_row_index, neighbor_col_index)
+        for ray in self._rays[row_index * self._no_of_col + col_index]:
+            for index in self._cells_of_bounded_discs(color, ray):
+                cells[index].switch_cell_disc_color()
+                self._hash ^= flip_keys[index]
+                flipped.append(index)
 
-            return cells_with_discs
-        
-        elif neighboring_cell.cell_content() == color:
-            # When we reach a disc of the color matching our
-            # original, we have reached the end of the series
-            # of bounded discs.
-            return []
-        
+        if color == WHITE:
+            self._white_discs.add(len(flipped))
+            self._black_discs.add(-len(flipped))
         else:
-            # If we reach something other than a bounded disc
-            # or the end of our bounded disc series, then
-            # there are not really any bounded discs. In that
-            # case, we have made an invalid move.
-            raise InvalidMoveError        
+            self._black_discs.add(len(flipped))
+            self._white_discs.add(-len(flipped))
+
+        for listener in self._listeners:
+            listener.discs_flipped(flipped, color)
+        
+    def _cells_of_bounded_discs(self, color: int, ray: (int)) -> (int):
+        '''
+        This takes a disc color the user wants to place at the start of the
+        given ray, which lists the indices of the cells in one direction out
+        to the edge of the board. It returns the indices of the discs of the
+        opposite color which would be bounded between the new disc and a
+        disc of the same color further along the ray. If nothing would be
+        bounded, the result is empty.
+        '''
+        cells = self._cells
+        opposite_color = -color
+        distance = 0
 
-    # The following functions give the addresses of cells
-    # neighboring a particular cell.
-    def _north_cell(row: int, col: int) -> (int):
-        return (row-1, col)
+        for index in ray:
+            content = cells[index].cell_content()
 
-    def _south_cell(row: int, col: int) -> (int):
-        return (row+1, col)
+            if content != opposite_color:
+                # The series of bounded discs only counts if it is
+                # closed off by a disc matching our original.
+                if content == color and distance > 0:
+                    return ray[:distance]
 
-    def _east_cell(row: int, col: int) -> (int):
-        return (row, col+1)
+                return ()
 
-    def _west_cell(row: int, col: int) -> (int):
-        return (row, col-1)
+            distance += 1
 
-    def _northeast_cell(row: int, col: int) -> (int):
-        return (row-1, col+1)
+        # The series ran off the edge of the board.
+        return ()
 
-    def _northwest_cell(row: int, col: int) -> (int):
-        return (row-1, col-1)   
+    def _frontier_of_board(self) -> {int}:
+        '''
+        Finds the frontier by looking at every cell.
+        '''
+        cells = self._cells
+        return {index for index, cell in enumerate(cells)
+                if cell.cell_content() == EMPTY
+                and any(cells[neighbor].cell_content() != EMPTY for neighbor in self._neighbors[index])}
 
-    def _southeast_cell(row: int, col: int) -> (int):
-        return (row+1, col+1)
 
-    def _southwest_cell(row: int, col: int) -> (int):
-        return (row+1, col-1)    
-        
+class BoardTables:
+    '''
+    The neighbors of every cell of a board of a particular size, and the
+    rays of cells leading away from every cell in each direction out to
+    the edge of the board, nearest first. Cells are given by their index,
+    row * col + column, and every list of cells is a compact array.
+    Rays which leave the board within one step are left out, since a
+    single cell can never hold a bounded disc followed by the closing disc.
+    '''
+    def __init__(self, rows: int, col: int) -> None:
+        self.rows = rows
+        self.col = col
+        neighbors = []
+        rays = []
+
+        for row_index in range(rows):
+            for col_index in range(col):
+                neighbors_of_cell = array.array('H')
+                rays_of_cell = []
+
+                for row_step, col_step in DIRECTIONS:
+                    row = row_index + row_step
+                    column = col_index + col_step
+                    ray = array.array('H')
+
+                    while 0 <= row < rows and 0 <= column < col:
+                        ray.append(row * col + column)
+                        row += row_step
+                        column += col_step
+
+                    if ray:
+                        neighbors_of_cell.append(ray[0])
+
+                    if len(ray) > 1:
+                        rays_of_cell.append(ray)
+
+                neighbors.append(neighbors_of_cell)
+                rays.append(tuple(rays_of_cell))
+
+        self.neighbors = tuple(neighbors)
+        self.rays = tuple(rays)
+
+
+@functools.cache
+def board_tables(rows: int, col: int) -> BoardTables:
+    '''
+    Returns the shared BoardTables for the given board dimensions,
+    building them the first time the dimensions are seen.
+    '''
+    return BoardTables(rows, col)
+
+
+def valid_size(rows: int, col: int) -> bool:
+    '''
+    Returns whether a board can have the given numbers of rows and columns:
+    each must be even and from 4 to 16.
+    '''
+    return rows % 2 == 0 and col % 2 == 0 and 4 <= rows <= 16 and 4 <= col <= 16
+
+
+def parse_size(text: str) -> (int, int):
+    '''
+    Reads a board size such as "8x8" or "6x10" as (rows, columns). Raises
+    InvalidSetting if it is malformed or not a valid size.
+    '''
+    try:
+        rows, col = (int(number) for number in text.lower().split('x'))
+    except ValueError:
+        raise InvalidSetting
+
+    if not valid_size(rows, col):
+        raise InvalidSetting
+
+    return (rows, col)
+
 
 class Cell:
     '''
@@ -445,6 +779,15 @@ class Cell:
         else:
             raise InvalidMoveError
 
+    def remove_disc(self) -> None:
+        '''
+        Empties the cell. Raises an error if it is already empty.
+        '''
+        if self._cell_state == EMPTY:
+            raise InvalidMoveError
+
+        self._cell_state = EMPTY
+
 
 class Counter:
     def __init__(self, start: int) -> None:
@@ -456,6 +799,9 @@ class Counter:
     def decrement(self) -> None:
         self._count -= 1
 
+    def add(self, amount: int) -> None:
+        self._count += amount
+
     def get_count(self) -> int:
         return self._count
 
@@ -0,0 +1,181 @@
+import argparse
+import functools
+import importlib
+import json
+import random
+import time
+
+
+# Instrumentation counts the calls to the hot paths below and adds up the
+# time spent in them, including the time of any instrumented calls they
+# make. Nothing is wrapped until enable is called, so the game runs at
+# full speed unless instrumentation has been asked for, and disable puts the
+# original methods back.
+
+# Moves in games go through place_disc, which flips the discs found by
+# legal_moves with _flip_discs_at, and moves in searches go through
+# apply_move and undo_move. valid_move and _flip_bounded_discs are only
+# used by callers of GameBoard's original interface, so in games they
+# count no calls; they are kept to cover that interface.
+GAME_PATHS = (('game_classes', 'GameState', 'player_take_turn'),
+              ('game_classes', 'GameState', 'next_player_turn'),
+              ('game_classes', 'GameBoard', 'no_moves'),
+              ('game_classes', 'GameBoard', 'legal_moves'),
+              ('game_classes', 'GameBoard', 'place_disc'),
+              ('game_classes', 'GameBoard', '_flip_discs_at'),
+              ('game_classes', 'GameBoard', 'apply_move'),
+              ('game_classes', 'GameBoard', 'undo_move'),
+              ('game_classes', 'GameBoard', 'valid_move'),
+              ('game_classes', 'GameBoard', '_flip_bounded_discs'))
+GUI_PATHS = (('othello_gui', 'OthelloApplication', '_refresh_game_window'),
+             ('othello_gui', 'BoardRenderer', 'recolor_discs'),
+             ('othello_gui', 'BoardRenderer', 'fit_to_canvas'))
+
+_originals = {}     # (class, method name) to the method replaced by enable
+_counters = {}      # "Class.method" to [calls, seconds]
+_count_sources = {} # Name to a function returning counts kept elsewhere
+
+
+def enable(paths: ((str, str, str)) = GAME_PATHS) -> None:
+    '''
+    Starts counting the given (module, class, method) hot paths. Paths
+    which are already being counted are left alone.
+    '''
+    for module_name, class_name, method_name in paths:
+        owner = getattr(importlib.import_module(module_name), class_name)
+
+        if (owner, method_name) in _originals:
+            continue
+
+        method = owner.__dict__[method_name]
+        _originals[(owner, method_name)] = method
+        setattr(owner, method_name, _timed(class_name + '.' + method_name, method))
+
+
+def disable() -> None:
+    '''
+    Puts back every method replaced by enable. The counts are kept.
+    '''
+    for (owner, method_name), method in _originals.items():
+        setattr(owner, method_name, method)
+
+    _originals.clear()
+
+
+def is_enabled() -> bool:
+    return bool(_originals)
+
+
+def reset() -> None:
+    '''
+    Sets every count and time back to zero.
+    '''
+    for counter in _counters.values():
+        counter[0] = 0
+        counter[1] = 0.0
+
+
+def _timed(name: str, method: "Function") -> "Function":
+    counter = _counters.setdefault(name, [0, 0.0])
+    perf_counter = time.perf_counter
+
+    @functools.wraps(method)
+    def timed(*args, **kwargs):
+        start = perf_counter()
+
+        try:
+            return method(*args, **kwargs)
+        finally:
+            counter[0] += 1
+            counter[1] += perf_counter() - start
+
+    return timed
+
+
+def stats() -> {str: {str: float}}:
+    '''
+    Returns the calls, total seconds and mean microseconds per call of
+    every hot path counted so far, the most costly first.
+    '''
+    return {name: {'calls': calls,
+                   'seconds': seconds,
+                   'mean_us': seconds/calls*1e6 if calls else 0.0}
+            for name, (calls, seconds) in sorted(_counters.items(), key = lambda item: -item[1][1])}
+
+
+def add_counts(name: str, counts: "Function") -> None:
+    '''
+    Shows the counts returned by counts, a function giving a dictionary
+    from names to numbers, in the overlay and the exported JSON under the
+    given name. It is for counts which are kept by other code rather than
+    by wrapping a method, such as the GUI's redraws and dropped frames.
+    '''
+    _count_sources[name] = counts
+
+
+def other_counts() -> {str: {str: int}}:
+    '''
+    Returns the current counts of every source given to add_counts.
+    '''
+    return {name: counts() for name, counts in _count_sources.items()}
+
+
+def export_json(path: str) -> None:
+    '''
+    Writes the stats, followed by the counts given to add_counts, to a
+    JSON file.
+    '''
+    with open(path, 'w') as stats_file:
+        json.dump({**stats(), **other_counts()}, stats_file, indent = 2)
+
+
+def overlay_text() -> str:
+    '''
+    Describes the stats in a few lines for an on-screen overlay.
+    '''
+    lines = ["{:32} {:8} calls {:9.1f} ms {:8.1f} us".format(
+                 name, path_stats['calls'], path_stats['seconds']*1000, path_stats['mean_us'])
+             for name, path_stats in stats().items()]
+    lines.extend("{:32} {}".format(name, "  ".join("{} {}".format(count, count_name.replace('_', ' '))
+                                                   for count_name, count in counts.items()))
+                 for name, counts in other_counts().items())
+    return '\n'.join(lines)
+
+
+def play_random_games(rows: int, col: int, games: int, seed: int = 0) -> None:
+    '''
+    Plays games of random moves on a GameBoard, to exercise the hot paths
+    without a window.
+    '''
+    import game_classes
+
+    generator = random.Random(seed)
+
+    for game_number in range(games):
+        game = game_classes.GameState(game_classes.BLACK, '>', rows, col, game_classes.WHITE)
+
+        while game.get_winner() is None:
+            game.player_take_turn(*generator.choice(sorted(game.legal_moves())))
+            game.next_player_turn()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description = "Count and time the game's hot paths over random games.")
+    parser.add_argument('--size', default = '16x16', help = "board size such as 8x8")
+    parser.add_argument('--games', type = int, default = 10, help = "games to play")
+    parser.add_argument('--json', default = None, help = "file to write the stats to")
+    args = parser.parse_args()
+
+    import game_classes
+
+    rows, col = game_classes.parse_size(args.size)
+    enable()
+    play_random_games(rows, col, args.games)
+    print(overlay_text())
+
+    if args.json is not None:
+        export_json(args.json)
+
+
+if __name__ == "__main__":
+    main()
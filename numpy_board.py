@@ -0,0 +1,300 @@
+import argparse
+import random
+import sys
+import time
+import game_classes
+from game_classes import EMPTY, BLACK, WHITE, DIRECTIONS
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# A batch holds N boards of the same size as an int8 array of shape
+# (N, rows, cols), with each cell holding EMPTY, BLACK or WHITE. Since
+# BLACK and WHITE are 1 and -1, flipping a disc is a change of sign.
+#
+# Every operation works on the whole batch at once by shifting boolean
+# arrays of shape (N, rows, cols) one cell in each of the eight directions.
+# NumPy is optional: the rest of the program does not need this module.
+
+
+def _shift(cells: "ndarray", row_step: int, col_step: int) -> "ndarray":
+    '''
+    Moves every cell of every board one step in the given direction.
+    Cells moved off the board are dropped and the vacated cells are False.
+    '''
+    shifted = numpy.zeros_like(cells)
+    rows, col = cells.shape[1:]
+    shifted[:, max(row_step, 0):rows + min(row_step, 0), max(col_step, 0):col + min(col_step, 0)] = \
+        cells[:, max(-row_step, 0):rows + min(-row_step, 0), max(-col_step, 0):col + min(-col_step, 0)]
+    return shifted
+
+
+class BoardBatch:
+    '''
+    A batch of boards of the same size, worked on all at once.
+    '''
+    def __init__(self, cells: "ndarray") -> None:
+        '''
+        Wraps an array of shape (N, rows, cols) holding EMPTY, BLACK or
+        WHITE in every cell.
+        '''
+        if numpy is None:
+            raise ImportError("numpy_board needs NumPy")
+
+        self.cells = numpy.asarray(cells, dtype = numpy.int8)
+
+        if self.cells.ndim != 3:
+            raise game_classes.InvalidSetting
+
+    @classmethod
+    def from_boards(cls, boards: ["GameBoard"]) -> "BoardBatch":
+        '''
+        Builds a batch from GameBoards or BitBoards, which must all
+        have the same size.
+        '''
+        if numpy is None:
+            raise ImportError("numpy_board needs NumPy")
+
+        rows, col = boards[0].no_of_rows(), boards[0].no_of_col()
+        mask_bytes = (rows*col + 7) // 8
+        black_bytes = bytearray()
+        white_bytes = bytearray()
+
+        for board in boards:
+            if (board.no_of_rows(), board.no_of_col()) != (rows, col):
+                raise game_classes.InvalidSetting
+
+            black, white = board.disc_masks()
+            black_bytes += black.to_bytes(mask_bytes, 'little')
+            white_bytes += white.to_bytes(mask_bytes, 'little')
+
+        # Bit row * cols + col of a mask is the cell at (row, col).
+        shape = (len(boards), mask_bytes)
+        black_bits = numpy.unpackbits(numpy.frombuffer(bytes(black_bytes), numpy.uint8).reshape(shape),
+                                      axis = 1, count = rows*col, bitorder = 'little')
+        white_bits = numpy.unpackbits(numpy.frombuffer(bytes(white_bytes), numpy.uint8).reshape(shape),
+                                      axis = 1, count = rows*col, bitorder = 'little')
+        cells = black_bits.astype(numpy.int8)*BLACK + white_bits.astype(numpy.int8)*WHITE
+        return cls(cells.reshape(len(boards), rows, col))
+
+    def __len__(self) -> int:
+        return self.cells.shape[0]
+
+    def no_of_rows(self) -> int:
+        return self.cells.shape[1]
+
+    def no_of_col(self) -> int:
+        return self.cells.shape[2]
+
+    def disc_counts(self, color: int) -> "ndarray":
+        '''
+        Returns the number of discs of the color on each board.
+        '''
+        return (self.cells == color).sum(axis = (1, 2))
+
+    def legal_move_masks(self, color: int) -> "ndarray":
+        '''
+        Returns a boolean array which is True at every empty cell where
+        the color can place a disc, for every board.
+        '''
+        own = self.cells == color
+        opp = self.cells == -color
+        empty = self.cells == EMPTY
+        moves = numpy.zeros_like(own)
+
+        # Grow runs of opponent discs outwards from the color's own discs.
+        # A run that reaches an empty cell makes that cell a move.
+        for row_step, col_step in DIRECTIONS:
+            run = _shift(own, row_step, col_step) & opp
+
+            while run.any():
+                moves |= _shift(run, row_step, col_step) & empty
+                run = _shift(run, row_step, col_step) & opp
+
+        return moves
+
+    def mobility(self, color: int) -> "ndarray":
+        '''
+        Returns the number of legal moves for the color on each board.
+        '''
+        return self.legal_move_masks(color).sum(axis = (1, 2))
+
+    def flip_masks(self, color: int, row_indices: "ndarray", col_indices: "ndarray") -> "ndarray":
+        '''
+        Returns a boolean array of the discs flipped on each board if the
+        color placed a disc at that board's (row, col). Boards where the
+        move flips nothing get an all-False mask.
+        '''
+        own = self.cells == color
+        opp = self.cells == -color
+        placed = numpy.zeros_like(own)
+        placed[numpy.arange(len(self)), row_indices, col_indices] = True
+        flips = numpy.zeros_like(own)
+
+        for row_step, col_step in DIRECTIONS:
+            run = numpy.zeros_like(own)
+            bounded = numpy.zeros(len(self), dtype = bool)
+            cursor = _shift(placed, row_step, col_step)
+
+            # The cursor only keeps moving while it is on opponent discs,
+            # so it stops at the first cell which is not one.
+            while cursor.any():
+                bounded |= (cursor & own).any(axis = (1, 2))
+                cursor &= opp
+                run |= cursor
+                cursor = _shift(cursor, row_step, col_step)
+
+            flips |= run & bounded[:, None, None]
+
+        flips[self.cells[numpy.arange(len(self)), row_indices, col_indices] != EMPTY] = False
+        return flips
+
+    def apply_moves(self, color: int, row_indices: "ndarray", col_indices: "ndarray") -> "BoardBatch":
+        '''
+        Returns a new batch with the color's disc placed at each board's
+        (row, col) and the bounded discs flipped. Raises InvalidMoveError
+        if the move on any board flips nothing.
+        '''
+        flips = self.flip_masks(color, row_indices, col_indices)
+
+        if not flips.any(axis = (1, 2)).all():
+            raise game_classes.InvalidMoveError
+
+        cells = numpy.where(flips, numpy.int8(color), self.cells)
+        cells[numpy.arange(len(self)), row_indices, col_indices] = color
+        return BoardBatch(cells)
+
+    def frontier_counts(self, color: int) -> "ndarray":
+        '''
+        Returns the number of the color's discs next to at least one
+        empty cell on each board.
+        '''
+        empty = self.cells == EMPTY
+        next_to_empty = numpy.zeros_like(empty)
+
+        for row_step, col_step in DIRECTIONS:
+            next_to_empty |= _shift(empty, row_step, col_step)
+
+        return ((self.cells == color) & next_to_empty).sum(axis = (1, 2))
+
+    def corner_counts(self, color: int) -> "ndarray":
+        '''
+        Returns the number of corners held by the color on each board.
+        '''
+        corners = self.cells[:, [0, 0, -1, -1], [0, -1, 0, -1]]
+        return (corners == color).sum(axis = 1)
+
+    def features(self, color: int) -> {str: "ndarray"}:
+        '''
+        Returns evaluation features from the color's point of view, one
+        value per board for each feature.
+        '''
+        return {'discs': self.disc_counts(color), 'opponent_discs': self.disc_counts(-color),
+                'mobility': self.mobility(color), 'opponent_mobility': self.mobility(-color),
+                'frontier': self.frontier_counts(color),
+                'opponent_frontier': self.frontier_counts(-color),
+                'corners': self.corner_counts(color), 'opponent_corners': self.corner_counts(-color)}
+
+
+def random_positions(rows: int, col: int, count: int, seed: int = 0) -> ["GameState"]:
+    '''
+    Plays count random games part of the way through on GameBoards and
+    returns the GameStates, each stopped at a random ply.
+    '''
+    generator = random.Random(seed)
+    games = []
+
+    for _ in range(count):
+        game = game_classes.GameState(BLACK, '>', rows, col, generator.choice((BLACK, WHITE)))
+
+        for _ in range(generator.randrange(rows*col - 4)):
+            if game.get_winner() is not None:
+                break
+
+            game.player_take_turn(*generator.choice(sorted(game.legal_moves())))
+            game.next_player_turn()
+
+        games.append(game)
+
+    return games
+
+
+def check(rows: int, col: int, count: int, seed: int = 0) -> bool:
+    '''
+    Compares the batch's disc counts, legal moves and flips with GameBoard
+    on random positions of the given size. Prints the speeds of both and
+    returns whether everything matched.
+    '''
+    boards = []
+
+    for game in random_positions(rows, col, count, seed):
+        board = game_classes.GameBoard(rows, col, BLACK)
+        board.load_masks(*game.disc_masks())
+        boards.append(board)
+
+    batch = BoardBatch.from_boards(boards)
+    matched = True
+
+    for color in (BLACK, WHITE):
+        start = time.perf_counter()
+        expected_moves = [board.legal_moves(color) for board in boards]
+        expected_counts = [board.no_of_black_discs() if color == BLACK else board.no_of_white_discs()
+                           for board in boards]
+        board_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        move_masks = batch.legal_move_masks(color)
+        counts = batch.disc_counts(color)
+        batch_seconds = time.perf_counter() - start
+
+        for index, moves in enumerate(expected_moves):
+            if set(zip(*numpy.nonzero(move_masks[index]))) != set(moves) \
+               or counts[index] != expected_counts[index]:
+                print("{}x{} board {}: moves or disc counts differ from GameBoard".format(rows, col, index))
+                matched = False
+
+        print("{}x{} {:5} {:6} boards  GameBoard {:8.4f}s  batch {:8.4f}s".format(
+            rows, col, game_classes.GameState.player_to_string(color), count,
+            board_seconds, batch_seconds))
+
+        # Check the flips of one legal move on every board which has one.
+        having_moves = [index for index, moves in enumerate(expected_moves) if moves]
+
+        if having_moves:
+            chosen = [min(expected_moves[index]) for index in having_moves]
+            sub_batch = BoardBatch(batch.cells[having_moves])
+            flips = sub_batch.flip_masks(color, numpy.array([r for r, c in chosen]),
+                                         numpy.array([c for r, c in chosen]))
+
+            for position, index in enumerate(having_moves):
+                if set(zip(*numpy.nonzero(flips[position]))) != set(expected_moves[index][chosen[position]]):
+                    print("{}x{} board {}: flips differ from GameBoard".format(rows, col, index))
+                    matched = False
+
+    return matched
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description = "Check the NumPy batch backend against GameBoard.")
+    parser.add_argument('--sizes', default = '4x4,8x8,6x10,16x16', help = "comma-separated sizes such as 8x8,6x10")
+    parser.add_argument('--boards', type = int, default = 1000, help = "random positions per size")
+    args = parser.parse_args()
+
+    if numpy is None:
+        sys.exit("NumPy is not installed")
+
+    all_matched = True
+
+    for size in args.sizes.split(','):
+        rows, col = game_classes.parse_size(size)
+        all_matched = check(rows, col, args.boards) and all_matched
+
+    if not all_matched:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
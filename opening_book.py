@@ -0,0 +1,155 @@
+import argparse
+import itertools
+import multiprocessing
+import struct
+import time
+import binary_records
+import bitboard
+import game_classes
+import othello_ai
+
+
+# An opening book file is a sorted array of fixed-size entries:
+#
+#     position hash                                eight bytes
+#     rows, columns, winner mode                   one byte each
+#     best move                                    two bytes, row * columns + column
+#
+# The hash is GameState.zobrist_hash, which covers the discs and the player
+# to move. Entries are sorted by hash, then by rows, columns and winner mode,
+# so a lookup is a binary search straight over the memory-mapped file.
+
+ENTRY = struct.Struct('<QBBBH')
+
+
+class OpeningBook:
+    '''
+    Looks up the best moves stored in an opening book file. The file is
+    not opened until the first lookup.
+    '''
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._file = None
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __len__(self) -> int:
+        return len(self._data()) // ENTRY.size
+
+    def lookup(self, game: "GameState") -> (int):
+        '''
+        Returns the (row, col) address of the book move for the player
+        whose turn it is, or None if the position is not in the book.
+        '''
+        if game.get_winner() is not None:
+            return None
+
+        data = self._data()
+        key = (game.zobrist_hash(), game.no_of_rows(), game.no_of_col(),
+               binary_records.MODE_CODES[game.winner_mode()])
+        low = 0
+        high = len(data) // ENTRY.size
+
+        # Find the first entry which is not less than the key.
+        while low < high:
+            middle = (low + high) // 2
+
+            if ENTRY.unpack_from(data, middle * ENTRY.size)[:4] < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low == len(data) // ENTRY.size:
+            return None
+
+        entry = ENTRY.unpack_from(data, low * ENTRY.size)
+
+        if entry[:4] != key:
+            return None
+
+        # A different position with the same hash must not make an illegal move.
+        move = divmod(entry[4], game.no_of_col())
+        return move if move in game.legal_moves() else None
+
+    def _data(self) -> bytes:
+        if self._file is None:
+            self._file = binary_records.MappedFile(self._path)
+
+        return self._file.data
+
+
+def book_entries(job: (int, int, int, int, str, int, int)) -> [(int, int, int, int, int)]:
+    '''
+    Searches every position reachable within the first plies of a game of
+    one configuration and returns a book entry holding each one's best move.
+    The job gives the rows, columns, first player, top-left center disc,
+    winner mode, number of plies and search depth.
+    '''
+    rows, col, first, topleft, mode, plies, depth = job
+    game = game_classes.GameState(first, mode, rows, col, topleft, bitboard.BitBoard)
+    player = othello_ai.AIPlayer(time_budget = None, max_depth = depth)
+    mode_code = binary_records.MODE_CODES[mode]
+    entries = {}
+
+    def visit(ply: int) -> None:
+        position_hash = game.zobrist_hash()
+
+        if ply == plies or game.get_winner() is not None or position_hash in entries:
+            return
+
+        entries[position_hash] = player.search(game).square
+
+        for row_index, col_index in sorted(game.legal_moves()):
+            game.apply_move(row_index, col_index)
+            visit(ply + 1)
+            game.undo_move()
+
+    visit(0)
+    return [(position_hash, rows, col, mode_code, square) for position_hash, square in entries.items()]
+
+
+def build_book(path: str, sizes: [(int)], plies: int, depth: int, processes: int = None) -> int:
+    '''
+    Builds an opening book covering both first players, both orientations
+    and both winner modes of every size, searching the configurations in
+    parallel. Returns the number of entries written.
+    '''
+    jobs = [(rows, col, first, topleft, mode, plies, depth)
+            for (rows, col), first, topleft, mode in itertools.product(
+                sizes, (game_classes.BLACK, game_classes.WHITE),
+                (game_classes.BLACK, game_classes.WHITE), ('>', '<'))]
+    entries = {}
+
+    # A position reached in more than one configuration is kept once.
+    with multiprocessing.Pool(processes) as pool:
+        for job_entries in pool.imap_unordered(book_entries, jobs):
+            for entry in job_entries:
+                entries.setdefault(entry[:4], entry[4])
+
+    with open(path, 'wb') as book_file:
+        for key in sorted(entries):
+            book_file.write(ENTRY.pack(*key, entries[key]))
+
+    return len(entries)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description = "Build an Othello opening book.")
+    parser.add_argument('output', help = "opening book file to write")
+    parser.add_argument('--sizes', default = '8x8', help = "comma-separated sizes such as 8x8,6x10")
+    parser.add_argument('--plies', type = int, default = 4, help = "plies from the start to cover")
+    parser.add_argument('--depth', type = int, default = 8, help = "search depth for each position")
+    parser.add_argument('--processes', type = int, default = None, help = "worker processes")
+    args = parser.parse_args()
+
+    sizes = [game_classes.parse_size(size) for size in args.sizes.split(',')]
+    start = time.perf_counter()
+    count = build_book(args.output, sizes, args.plies, args.depth, args.processes)
+    print("Wrote {} positions in {:.1f}s".format(count, time.perf_counter() - start))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,494 @@
+import functools
+import time
+import bitboard
+import transposition
+from game_classes import InvalidMoveError, InvalidSetting
+
+
+WIN_SCORE = 100000      # Added to the final disc margin of a won game
+PASS = -1               # Stands for a pass in a principal variation
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class SearchResult:
+    '''
+    Describes the outcome of one search: the chosen square, its score
+    for the player to move and how much work it took.
+    '''
+    def __init__(self, square: int, score: int, depth: int, nodes: int,
+                 elapsed: float, depth_times: [(int, float, int)],
+                 principal_variation: [int]) -> None:
+        self.square = square
+        self.score = score
+        self.depth = depth
+        self.nodes = nodes
+        self.elapsed = elapsed
+        self.depth_times = depth_times      # (depth, seconds, nodes) per completed iteration
+        self.principal_variation = principal_variation
+
+    def nodes_per_second(self) -> float:
+        '''
+        Returns the search speed in nodes per second.
+        '''
+        if self.elapsed == 0:
+            return 0.0
+
+        return self.nodes/self.elapsed
+
+
+class AIPlayer:
+    '''
+    A computer opponent which picks moves for a GameState using negamax
+    alpha-beta search with iterative deepening. The search stops when
+    the time budget (in seconds) runs out or max_depth is reached, and the
+    move found by the deepest completed iteration is played. Results are
+    kept between searches in a transposition table of hash_megabytes.
+    Positions found in the opening book, if one is given, are not searched,
+    and positions the endgame solver, if one is given, can solve are solved
+    when it finishes within half of the time budget.
+    A pattern evaluator, if one is given, scores the positions at the end of
+    the search whenever its weights suit the game's size and winner mode.
+    The search keeps its pattern indices up to date move by move, so it
+    should not also be attached to a board.
+    '''
+    def __init__(self, time_budget: float = 1.0, max_depth: int = 64,
+                 hash_megabytes: float = 16, book: "OpeningBook" = None,
+                 endgame: "EndgameSolver" = None, evaluator: "PatternEvaluator" = None) -> None:
+        self._time_budget = time_budget
+        self._book = book
+        self._endgame = endgame
+        self._evaluator = evaluator
+        self._pattern_evaluator = None
+        self._max_depth = max_depth
+        self._table = transposition.TranspositionTable(hash_megabytes)
+        self._keys = None
+        self._deadline = None
+        self._nodes = 0
+        self._geometry = None
+        self._square_classes = ()
+        self._corners = 0
+        self._mode_sign = 1
+        self._pv = []
+        self._pv_lines = []
+        self._should_stop = None
+
+    def set_time_budget(self, time_budget: float) -> None:
+        '''
+        Changes the seconds allowed for each search. None means no limit.
+        '''
+        self._time_budget = time_budget
+
+    def choose_move(self, game: "GameState") -> (int):
+        '''
+        Returns the (row, col) address of the move to play for the
+        player whose turn it is.
+        '''
+        result = self.search(game)
+        return divmod(result.square, game.no_of_col())
+
+    def search(self, game: "GameState", progress: "Function" = None,
+               should_stop: "Function" = None) -> SearchResult:
+        '''
+        Searches the position of the given game for the player whose turn
+        it is. Raises InvalidMoveError if that player has no moves. After
+        every completed iteration, progress (if given) is called with the
+        SearchResult so far. The search also ends early, keeping the best
+        move found so far, once should_stop (if given) returns True.
+        '''
+        start = time.perf_counter()
+        self._should_stop = should_stop
+
+        if self._book is not None:
+            book_move = self._book.lookup(game)
+
+            if book_move is not None:
+                square = book_move[0]*game.no_of_col() + book_move[1]
+                return SearchResult(square, 0, 0, 0, time.perf_counter() - start, [], [square])
+
+        # The solver gets half of the time budget. If it cannot finish in
+        # that time, the position is searched as usual with the rest.
+        if self._endgame is not None and self._endgame.can_solve(game):
+            solve_deadline = None if self._time_budget is None else start + self._time_budget/2
+
+            try:
+                solved = self._endgame.solve(game, deadline = solve_deadline, should_stop = should_stop)
+            except SearchTimeout:
+                pass
+            else:
+                elapsed = time.perf_counter() - start
+                return SearchResult(solved.square, solved.outcome*WIN_SCORE, solved.empties,
+                                    solved.nodes, elapsed, [(solved.empties, elapsed, solved.nodes)],
+                                    [solved.square])
+
+        self._prepare(game)
+        own, opp = self._own_and_opp(game)
+        own_keys, opp_keys = self._own_and_opp_keys(game)
+        root_hash = game.zobrist_hash()
+        geometry = self._geometry
+        root_moves = self._ordered_squares(geometry.move_mask(own, opp))
+
+        if len(root_moves) == 0:
+            raise InvalidMoveError
+
+        if self._time_budget is None:
+            self._deadline = None
+        else:
+            self._deadline = start + self._time_budget
+
+            # Half of the time left, which is less than half of the budget
+            # when the endgame solver used some of it.
+            halfway = (time.perf_counter() + self._deadline)/2
+
+        self._nodes = 0
+        self._pv = []
+        self._table.new_search()
+        best_square = root_moves[0]
+        best_score = 0
+        depth_reached = 0
+        depth_times = []
+        empties = geometry.size - (own | opp).bit_count()
+
+        # A single legal move needs no search.
+        if len(root_moves) == 1:
+            return SearchResult(best_square, 0, 0, 0, time.perf_counter() - start,
+                                depth_times, [best_square])
+
+        for depth in range(1, self._max_depth + 1):
+            try:
+                score, square, scores = self._search_root(own, opp, root_hash, own_keys,
+                                                          opp_keys, depth, root_moves)
+            except SearchTimeout:
+                break
+
+            best_square, best_score, depth_reached = square, score, depth
+            elapsed = time.perf_counter() - start
+            depth_times.append((depth, elapsed, self._nodes))
+
+            if progress is not None:
+                progress(SearchResult(best_square, best_score, depth, self._nodes, elapsed,
+                                      list(depth_times), list(self._pv_lines[0])))
+
+            # Try the moves in the order of this iteration's scores next time.
+            root_moves = sorted(root_moves, key = lambda move: -scores[move])
+            self._pv = self._pv_lines[0]
+
+            # Once every line reaches the end of the game, deeper searches
+            # cannot change the result. Otherwise, do not start an iteration
+            # which is unlikely to finish in time.
+            if depth >= empties or abs(score) >= WIN_SCORE:
+                break
+
+            if self._deadline is not None and time.perf_counter() > halfway:
+                break
+
+        return SearchResult(best_square, best_score, depth_reached, self._nodes,
+                            time.perf_counter() - start, depth_times, list(self._pv))
+
+    def _prepare(self, game: "GameState") -> None:
+        '''
+        Gets the tables for the game's board size and winner mode ready.
+        '''
+        self._mode_sign = prepare_table(self._table, game.winner_mode())
+
+        rows, col = game.no_of_rows(), game.no_of_col()
+        self._geometry = bitboard.board_geometry(rows, col)
+        self._keys = transposition.zobrist_keys(rows, col)
+        self._square_classes = square_classes(rows, col)
+        self._corners = self._square_classes[0]
+
+        if self._evaluator is not None and self._evaluator.weights().matches(rows, col, game.winner_mode()):
+            self._pattern_evaluator = self._evaluator
+        else:
+            self._pattern_evaluator = None
+
+        # Passes can make a line longer than the number of squares.
+        self._pv_lines = [[] for ply in range(2*rows*col + 2)]
+
+    def _own_and_opp(self, game: "GameState") -> (int):
+        '''
+        Returns the disc masks of the player to move and of the opponent.
+        '''
+        black, white = game.disc_masks()
+
+        if game.player_making_move() == bitboard.BLACK:
+            return (black, white)
+        elif game.player_making_move() == bitboard.WHITE:
+            return (white, black)
+        else:
+            raise InvalidMoveError
+
+    def _own_and_opp_keys(self, game: "GameState") -> (()):
+        '''
+        Returns the Zobrist keys for placing a disc of the player to move
+        and of the opponent.
+        '''
+        if game.player_making_move() == bitboard.BLACK:
+            return (self._keys.black, self._keys.white)
+        else:
+            return (self._keys.white, self._keys.black)
+
+    def _search_root(self, own: int, opp: int, position_hash: int, own_keys: (int),
+                     opp_keys: (int), depth: int, root_moves: [int]) -> (int, int, {int: int}):
+        '''
+        Searches every root move to the given depth. Returns the best score,
+        the best square and the score found for each square.
+        '''
+        flip_mask = self._geometry.flip_mask
+        alpha = -2*WIN_SCORE
+        beta = 2*WIN_SCORE
+        best_square = root_moves[0]
+        scores = {}
+
+        # Search the previous iteration's best move first.
+        if self._pv and self._pv[0] in root_moves:
+            root_moves = [self._pv[0]] + [move for move in root_moves if move != self._pv[0]]
+
+        # The pattern indices are followed move by move from here. A timed
+        # out iteration leaves them part way down a line, so they are set
+        # from the root position at the start of every iteration.
+        evaluator = self._pattern_evaluator
+        color = self._color_of(own_keys)
+
+        if evaluator is not None:
+            evaluator.board_loaded(*((own, opp) if color == bitboard.BLACK else (opp, own)))
+
+        for index, square in enumerate(root_moves):
+            flips = flip_mask(own, opp, square)
+
+            if evaluator is not None:
+                evaluator.apply_move(square, flips, color)
+
+            score = -self._negamax(opp & ~flips, own | flips | (1 << square),
+                                   self._keys.child_hash(position_hash, own_keys, square, flips),
+                                   opp_keys, own_keys, depth - 1, -beta, -alpha, 1, index == 0)
+
+            if evaluator is not None:
+                evaluator.undo_move(square, flips, color)
+
+            scores[square] = score
+
+            if score > alpha:
+                alpha = score
+                best_square = square
+                self._pv_lines[0] = [square] + self._pv_lines[1]
+
+        self._table.store(position_hash, depth, alpha, transposition.EXACT, best_square)
+        return (alpha, best_square, scores)
+
+    def _negamax(self, own: int, opp: int, position_hash: int, own_keys: (int),
+                 opp_keys: (int), depth: int, alpha: int, beta: int, ply: int,
+                 on_pv: bool) -> int:
+        '''
+        Returns the score of the position for the player owning the discs
+        in own, searched to the given depth within the alpha-beta window.
+        own_keys and opp_keys are the Zobrist keys for each player's discs.
+        '''
+        self._nodes += 1
+        self._pv_lines[ply] = []
+
+        if self._nodes & 1023 == 0:
+            if self._deadline is not None and time.perf_counter() > self._deadline:
+                raise SearchTimeout
+
+            if self._should_stop is not None and self._should_stop():
+                raise SearchTimeout
+
+        geometry = self._geometry
+        moves = geometry.move_mask(own, opp)
+
+        if moves == 0:
+            if geometry.move_mask(opp, own) == 0:
+                return self._final_score(own, opp)
+
+            # Pass the turn without using up any depth.
+            on_pv = on_pv and ply < len(self._pv) and self._pv[ply] == PASS
+            score = -self._negamax(opp, own, position_hash ^ self._keys.side_to_move,
+                                   opp_keys, own_keys, depth, -beta, -alpha, ply + 1, on_pv)
+            self._pv_lines[ply] = [PASS] + self._pv_lines[ply + 1]
+            return score
+
+        if depth == 0:
+            return self._evaluate(own, opp, moves, own_keys)
+
+        original_alpha = alpha
+        table_square = transposition.NO_SQUARE
+        entry = self._table.probe(position_hash)
+
+        if entry is not None:
+            table_depth, table_score, table_flag, table_square = entry
+
+            if table_depth >= depth and not on_pv:
+                if table_flag == transposition.EXACT:
+                    return table_score
+                elif table_flag == transposition.LOWER_BOUND:
+                    alpha = max(alpha, table_score)
+                else:
+                    beta = min(beta, table_score)
+
+                if alpha >= beta:
+                    return table_score
+
+        ordered = self._ordered_squares(moves)
+
+        # Follow the previous iteration's principal variation first,
+        # then the best move stored in the transposition table.
+        if on_pv and ply < len(self._pv) and self._pv[ply] in ordered:
+            first_square = self._pv[ply]
+        else:
+            on_pv = False
+            first_square = table_square
+
+        if first_square != transposition.NO_SQUARE and moves >> first_square & 1:
+            ordered.remove(first_square)
+            ordered.insert(0, first_square)
+
+        flip_mask = geometry.flip_mask
+        best = -2*WIN_SCORE
+        best_square = ordered[0]
+        evaluator = self._pattern_evaluator
+
+        if evaluator is not None:
+            color = self._color_of(own_keys)
+
+        for index, square in enumerate(ordered):
+            flips = flip_mask(own, opp, square)
+
+            if evaluator is not None:
+                evaluator.apply_move(square, flips, color)
+
+            score = -self._negamax(opp & ~flips, own | flips | (1 << square),
+                                   self._keys.child_hash(position_hash, own_keys, square, flips),
+                                   opp_keys, own_keys, depth - 1, -beta, -alpha, ply + 1,
+                                   on_pv and index == 0)
+
+            if evaluator is not None:
+                evaluator.undo_move(square, flips, color)
+
+            if score > best:
+                best = score
+                best_square = square
+
+                if score > alpha:
+                    alpha = score
+                    self._pv_lines[ply] = [square] + self._pv_lines[ply + 1]
+
+                    if alpha >= beta:
+                        break
+
+        if best <= original_alpha:
+            flag = transposition.UPPER_BOUND
+        elif best >= beta:
+            flag = transposition.LOWER_BOUND
+        else:
+            flag = transposition.EXACT
+
+        self._table.store(position_hash, depth, best, flag, best_square)
+        return best
+
+    def _color_of(self, own_keys: (int)) -> int:
+        '''
+        Returns the color of the player whose Zobrist keys are given.
+        '''
+        return bitboard.BLACK if own_keys is self._keys.black else bitboard.WHITE
+
+    def _evaluate(self, own: int, opp: int, own_moves: int, own_keys: (int)) -> int:
+        '''
+        Estimates the value of a position for the owner of own from
+        mobility and corners. Corners hold discs for the rest of the
+        game, which only helps when the higher score wins. With a pattern
+        evaluator, its estimate of the final margin is used instead.
+        '''
+        if self._pattern_evaluator is not None:
+            return int(10*self._pattern_evaluator.evaluate(self._color_of(own_keys)))
+
+        opp_moves = self._geometry.move_mask(opp, own)
+        corners = self._corners
+        score = 10*(own_moves.bit_count() - opp_moves.bit_count())
+        score += self._mode_sign*40*((own & corners).bit_count() - (opp & corners).bit_count())
+        return score
+
+    def _final_score(self, own: int, opp: int) -> int:
+        '''
+        Scores a finished game for the owner of own, following
+        GameState._determine_winner.
+        '''
+        margin = self._mode_sign*(own.bit_count() - opp.bit_count())
+
+        if margin > 0:
+            return WIN_SCORE + margin
+        elif margin < 0:
+            return -WIN_SCORE + margin
+        else:
+            return 0
+
+    def _ordered_squares(self, moves: int) -> [int]:
+        '''
+        Lists the squares in a move mask from the usually best to the
+        usually worst: corners, edges, the interior, then the squares
+        next to corners.
+        '''
+        ordered = []
+
+        for class_mask in self._square_classes:
+            ordered.extend(bitboard.bits_of(moves & class_mask))
+
+        return ordered
+
+
+def prepare_table(table: transposition.TranspositionTable, winner_mode: str) -> int:
+    '''
+    Gets a transposition table ready for searching a game with the given
+    winner mode. Returns the sign of the final disc margin for the player
+    it is scored for: 1 when the higher score wins and -1 when the lower
+    one does. Raises InvalidSetting for any other winner mode.
+    '''
+    if winner_mode == '>':
+        mode_sign = 1
+    elif winner_mode == '<':
+        mode_sign = -1
+    else:
+        raise InvalidSetting
+
+    table.set_winner_mode(winner_mode)
+    return mode_sign
+
+
+@functools.cache
+def square_classes(rows: int, col: int) -> (int):
+    '''
+    Splits the board into masks of corners, edges, interior squares,
+    squares orthogonally next to a corner and squares diagonally next to
+    a corner. Every square belongs to exactly one mask.
+    '''
+    def bit(row: int, column: int) -> int:
+        return 1 << (row*col + column)
+
+    corner_addresses = ((0, 0), (0, col - 1), (rows - 1, 0), (rows - 1, col - 1))
+    corners = 0
+    c_squares = 0
+    x_squares = 0
+
+    for row, column in corner_addresses:
+        corners |= bit(row, column)
+        step_row = 1 if row == 0 else -1
+        step_col = 1 if column == 0 else -1
+        c_squares |= bit(row + step_row, column) | bit(row, column + step_col)
+        x_squares |= bit(row + step_row, column + step_col)
+
+    edges = 0
+
+    for row in range(rows):
+        edges |= bit(row, 0) | bit(row, col - 1)
+
+    for column in range(col):
+        edges |= bit(0, column) | bit(rows - 1, column)
+
+    full = (1 << (rows*col)) - 1
+    c_squares &= ~corners
+    x_squares &= ~(corners | c_squares)
+    edges &= ~(corners | c_squares)
+    interior = full & ~(corners | edges | c_squares | x_squares)
+    return (corners, edges, interior, c_squares, x_squares)
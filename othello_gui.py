@@ -0,0 +1,601 @@
+import tkinter
+import game_classes
+import math
+import time
+import cartesian
+import ai_worker
+import instrumentation
+        
+    
+
+class OptionsWindow:
+    def __init__(self) -> None:
+        '''
+        Sets up the window with its components and the variables
+        which hold the results of the input.
+        '''
+        # Variables to be based on input at interface
+        self._no_of_rows = 0
+        self._no_of_col = 0
+        self._first_player = game_classes.EMPTY
+        self._initial_topleft_disc = game_classes.EMPTY
+        self._winner_option = ""
+        self._computer_player = game_classes.EMPTY
+
+        # Window and input components
+        self._dialog_window = tkinter.Toplevel()
+        #label = tkinter.Label(master = self._dialog_window,
+        #                      font = ('Times', '21'), text = "Choose even\nnumbers of rows\nand columns...",
+        #                      padx = 10, pady = 15)
+        #label.grid(row = 0, column = 0, sticky = tkinter.W)
+        self._row_entry = self._entry_field('Rows (Even Number in 4-16)', 1, 0)      
+        self._col_entry = self._entry_field('Columns (Even Number in 4-16)', 2, 0)       
+        self._first_player_options = self._two_checkbox_options("First Player",
+                                                                "Black", "White",
+                                                                3, 0)
+        self._initial_topleft_disc_options = self._two_checkbox_options("Initial Top-left Disc",
+                                                                        "Black", "White", 5, 0)
+        self._winner_options = self._two_checkbox_options("Winner Options",
+                                                          "Higher Score",
+                                                          "Lower Score", 7, 0)
+        self._computer_player_options = self._two_checkbox_options("Computer Player (Optional)",
+                                                                   "Black", "White", 9, 0)
+        self.ok_button = tkinter.Button(master = self._dialog_window, text = "Ok",
+                                        font = ('Times', '15'),
+                                        command = self._ok_button_pressed)
+        self.ok_button.grid(row = 11, column = 1, sticky = tkinter.W + tkinter.E, pady = 30, padx = 15)
+        self.msg_text = tkinter.StringVar()
+        self.msg_text.set("")
+        self.msg_label = tkinter.Label(master = self._dialog_window,
+                                       textvariable = self.msg_text,
+                                       font = ('Times', '15'))
+        self.msg_label.grid(row = 11, column = 0, sticky = tkinter.W + tkinter.E)
+
+    def get_no_of_rows(self) -> int:
+        return self._no_of_rows
+
+    def get_no_of_col(self) -> int:
+        return self._no_of_col
+
+    def get_first_player(self) -> int:
+        return self._first_player
+
+    def get_initial_topleft_disc(self) -> int:
+        return self._initial_topleft_disc
+
+    def get_winner_mode(self) -> int:
+        return self._winner_option
+
+    def get_computer_player(self) -> int:
+        return self._computer_player
+
+    def show(self) -> None:
+        '''
+        Makes the window active.
+        '''
+        self._dialog_window.grab_set()
+        self._dialog_window.wait_window()
+
+    def _entry_field(self, label_text: str, row_index: int, col_index: int) -> tkinter.Entry:
+        '''
+        Gives the window an entry field with a label next to it.
+        Returns the entry field.
+        '''
+        label = tkinter.Label(master = self._dialog_window,
+                              font = ('Times', '15'), text = label_text,
+                              padx = 10, pady = 15)
+        label.grid(row = row_index, column = col_index, sticky = tkinter.W)
+        entry_field = tkinter.Entry(master = self._dialog_window,
+                                    font = ('Times', 15))
+        entry_field.grid(row = row_index, column = col_index+1, sticky = tkinter.W, padx = 15)
+        return entry_field
+
+    def _two_checkbox_options(self, main_label: str, sublabel_1: str, sublabel_2: str,
+                              row_index: int, col_index: int) -> ("tkinter.Checkbutton.variable"):
+        '''
+        This gives the window two labled checkboxes under a single main label.
+        The variables holding the checkbox inputs are returned as a tuple.
+        The given indexes should be the top left corner of an available
+        Grid space of 2 units high and 4 units wide.
+        '''
+        label = tkinter.Label(master = self._dialog_window, font = ('Times', '15'),
+                              text = main_label, padx = 10, pady = 15)        
+        label.grid(row = row_index, column = col_index, sticky = tkinter.W, columnspan = 4)
+
+        checkbox_values = (tkinter.IntVar(), tkinter.IntVar())
+        checkbox_1 = tkinter.Checkbutton(master = self._dialog_window, text = sublabel_1, variable = checkbox_values[0])
+        checkbox_1.grid(row = row_index+1, column = col_index+0, sticky = tkinter.W + tkinter.E)
+        checkbox_2 = tkinter.Checkbutton(master = self._dialog_window, text = sublabel_2, variable = checkbox_values[1])
+        checkbox_2.grid(row = row_index+1, column = col_index+1, sticky = tkinter.W + tkinter.E)
+        return checkbox_values
+
+    def _ok_button_pressed(self) -> None:
+        '''
+        Stores the user's input when the ok button is pressed.
+        '''
+        try:
+            self._no_of_rows = OptionsWindow._read_rows_or_col(self._row_entry)
+            self._no_of_col = OptionsWindow._read_rows_or_col(self._col_entry)                   
+            self._first_player = OptionsWindow._read_player_color(self._first_player_options)
+            self._initial_topleft_disc = OptionsWindow._read_player_color(self._initial_topleft_disc_options)
+            self._winner_option = OptionsWindow._read_winner_settings(self._winner_options)
+
+            # Leaving both boxes empty means there is no computer player.
+            if self._computer_player_options[0].get() == 0 and self._computer_player_options[1].get() == 0:
+                self._computer_player = game_classes.EMPTY
+            else:
+                self._computer_player = OptionsWindow._read_player_color(self._computer_player_options)
+            
+        except game_classes.InvalidSetting:
+            self.msg_text.set("INVALID")
+            
+        except ValueError:
+            self.msg_text.set("INVALID")
+            
+        else:
+            self._dialog_window.destroy()
+
+    def _read_player_color(player_checkbox_options: ("tkinter.Checkbutton.variable")) -> int:
+        '''
+        This takes a tuple of two Checkbutton.variables, assuming the first represents
+        BLACK and the second represents WHITE. Returns the appropriate player color.
+        Raises error if neither or both boxes were checked.
+        '''
+        if player_checkbox_options[0].get() == 1 and player_checkbox_options[1].get() == 0:
+            return game_classes.BLACK
+        elif player_checkbox_options[0].get() == 0 and player_checkbox_options[1].get() == 1:
+            return game_classes.WHITE
+        else:
+            raise game_classes.InvalidSetting        
+
+    def _read_rows_or_col(rows_or_col_entry: tkinter.Entry) -> int:
+        '''
+        Reads and validates the entered number of rows and columns.
+        '''
+        if int(rows_or_col_entry.get())%2 == 0 and int(rows_or_col_entry.get()) >= 4 and int(rows_or_col_entry.get()) <= 16:
+            return int(rows_or_col_entry.get())
+        else:
+            raise game_classes.InvalidSetting        
+
+    def _read_winner_settings(winner_options: ("tkinter.Checkbutton.variable")) -> str:
+        '''
+        Reads the winner settings and raises an error if necessary.
+        '''
+        if winner_options[0].get() == 1 and winner_options[1].get() == 0:
+            return '>'
+        elif winner_options[0].get() == 0 and winner_options[1].get() == 1:
+            return '<'
+        else:
+            raise game_classes.InvalidSetting
+        
+
+class OthelloApplication:
+    AI_POLL_MS = 50         # How often the computer player's messages are read
+    OVERLAY_MS = 500        # How often the instrumentation overlay is updated
+
+    def __init__(self, max_redraws_per_second: float = 60, computer_seconds: float = 2.0) -> None:
+        '''
+        Sets up the gameboard window and its components which
+        will display the state of the game. While the window is
+        being resized, the board is redrawn at most
+        max_redraws_per_second times a second. A computer player,
+        if chosen, takes about computer_seconds for each move.
+        '''
+        self._root_window = tkinter.Tk()
+        self._root_window.configure(background = '#B8E5F5')
+        self.msg_text = tkinter.StringVar()
+        self.msg_text.set("Waiting for user-entered settings...     ")
+        self.msg_label = self._heading_label(self.msg_text, 2, 0, 2)   # Create the message label early.     
+        
+        options_window = OptionsWindow()
+        options_window.show()
+        self._game = game_classes.GameState(options_window.get_first_player(),
+                                            options_window.get_winner_mode(),
+                                            options_window.get_no_of_rows(),
+                                            options_window.get_no_of_col(),
+                                            options_window.get_initial_topleft_disc())        
+
+        # Text variables for the labels
+        self.black_score = tkinter.StringVar()
+        self.white_score = tkinter.StringVar()
+        self.game_version = tkinter.StringVar()
+        self.error_msg = tkinter.StringVar()
+        self.game_version.set("OTHELLO")
+
+        # Heading labels
+        self._black_score_label = self._heading_label(self.black_score, \
+                                                      1, 0, 1)
+        self._white_score_label = self._heading_label(self.white_score, \
+                                                      1, 1, 1)
+        self._game_mode_label = self._heading_label(self.game_version, 0, 0, 2)
+
+        # Error label
+        self.error_label = tkinter.Label(master = self._root_window,
+                              font = ('Times', '12'), textvariable = self.error_msg,
+                              padx = 4, pady = 4, justify = tkinter.CENTER,
+                              anchor = tkinter.CENTER)
+        self.error_label.configure(background = '#B8E5F5')
+        self.error_label.grid(row = 3, column = 0, columnspan = 2, sticky = tkinter.N + tkinter.S + tkinter.W + tkinter.E)
+
+        # Gameboard display
+        self._gameboard_display = tkinter.Canvas(master = self._root_window,
+                                                 width = 50*self._game.no_of_col(),
+                                                 height = 50*self._game.no_of_rows(),
+                                                 background = 'white')
+        self._gameboard_display.grid(row = 4, column = 0, columnspan = 2,
+                                     sticky = tkinter.N + tkinter.S + tkinter.W + tkinter.E)
+        self._resize_redraws = CoalescedRedraw(self._gameboard_display,
+                                               lambda: self._refresh_game_window(None),
+                                               max_redraws_per_second)
+        self._gameboard_display.bind('<Configure>', self._resize_redraws.request)
+        self._gameboard_display.bind('<Destroy>', lambda event: self._resize_redraws.cancel())
+        self._gameboard_display.bind('<Button-1>', self._on_mouse_click)
+        self._gameboard_rectangles = self._cell_display()
+        self._grid_index = cartesian.GridIndex(self._game.no_of_rows(), self._game.no_of_col())
+        self._gameboard_discs = self._disc_display()
+        self._renderer = BoardRenderer(self._gameboard_display, self._gameboard_rectangles,
+                                       self._gameboard_discs, self._game.no_of_col())
+
+        # Column and row responses to reconfiguring the window
+        self._root_window.rowconfigure(4, weight = 1)
+        self._root_window.columnconfigure(0, weight = 1)
+        self._root_window.columnconfigure(1, weight = 1)
+
+        # The computer player searches in a worker process, and its
+        # messages are read from the event loop, so the window never waits.
+        self._computer_player = options_window.get_computer_player()
+        self._computer_seconds = computer_seconds
+        self._ai_worker = None
+        self._ai_job = None
+        self.ai_status = tkinter.StringVar()
+
+        if self._computer_player != game_classes.EMPTY:
+            ai_label = tkinter.Label(master = self._root_window, font = ('Times', '12'),
+                                     textvariable = self.ai_status, padx = 4, pady = 4)
+            ai_label.configure(background = '#B8E5F5')
+            ai_label.grid(row = 5, column = 0, columnspan = 2, sticky = tkinter.W + tkinter.E)
+            self._ai_worker = ai_worker.AIWorker()
+            self._root_window.protocol('WM_DELETE_WINDOW', self._close)
+            self._root_window.after_idle(self._start_computer_job)
+            self._root_window.after(OthelloApplication.AI_POLL_MS, self._poll_computer)
+
+        # With instrumentation enabled, its stats are shown over the board; F3 hides them.
+        self._overlay = None
+
+        if instrumentation.is_enabled():
+            self._overlay = self._gameboard_display.create_text(4, 4, anchor = tkinter.NW,
+                                                                font = ('Courier', '9'), fill = 'black')
+            self._root_window.bind('<F3>', self._toggle_overlay)
+            instrumentation.add_counts('Resize redraws', self._resize_redraws.counts)
+            self._update_overlay()
+
+    def run(self) -> None:
+        '''
+        Makes the window active.
+        '''
+        self._root_window.mainloop()        
+
+    def _heading_label(self, label_text: str, row_index: int, col_index: int, col_span: int) -> tkinter.Label:
+        '''
+        Creates a centered label in a heading format and puts it straight into the grid.
+        '''
+        label = tkinter.Label(master = self._root_window,
+                              font = ('Times', '21'), textvariable = label_text,
+                              padx = 10, pady = 7, justify = tkinter.CENTER,
+                              anchor = tkinter.CENTER)
+        label.configure(background = '#B8E5F5')
+        label.grid(row = row_index, column = col_index, columnspan = col_span,
+                   sticky = tkinter.N + tkinter.S + tkinter.W + tkinter.E)
+
+        return label
+
+    def _on_mouse_click(self, event: tkinter.Event):
+        '''
+        The response when the user clicks on the gameboard display.
+        '''
+        click_point = cartesian.Point(event.x, event.y, self._gameboard_display.winfo_width(),
+                                      self._gameboard_display.winfo_height())
+        grid_coord = self._grid_index.cell_at(click_point)
+
+        if grid_coord is None:
+            return
+
+        if self._game.player_making_move() == self._computer_player:
+            self.error_msg.set("Wait for the computer's move")
+            return
+
+        self._play_move(grid_coord[0], grid_coord[1])
+
+    def _play_move(self, row_index: int, col_index: int) -> None:
+        '''
+        Makes a move for the player whose turn it is and shows it. Then the
+        computer player, if any, starts thinking about the next move.
+        '''
+        try:
+            self._game.player_take_turn(row_index, col_index)
+        except game_classes.InvalidMoveError:
+            # If the move fails, do not change the
+            # state of the rectangles and circles.
+            self.error_msg.set("Invalid Move")
+        else:
+            # Update only the discs changed by the move.
+            self._update_disc_display(self._gameboard_discs, self._game.last_move_changes())
+            self._renderer.recolor_discs(self._game.last_move_changes())
+            self.error_msg.set("")
+            self._game.next_player_turn()
+            self._refresh_game_window(None)
+
+            if self._ai_worker is not None:
+                self._start_computer_job()
+
+    def _start_computer_job(self) -> None:
+        '''
+        Cancels what the computer player was doing. On the computer's turn
+        it starts a search for its move; on the other player's turn it
+        ponders the position instead.
+        '''
+        if self._ai_job is not None:
+            self._ai_job.cancel()
+            self._ai_job = None
+
+        if self._game.get_winner() is not None:
+            self.ai_status.set("")
+        elif self._game.player_making_move() == self._computer_player:
+            self._ai_job = self._ai_worker.search(self._game, self._computer_seconds)
+            self.ai_status.set("Computer is thinking...")
+        else:
+            self._ai_job = self._ai_worker.ponder(self._game)
+            self.ai_status.set("Computer is pondering...")
+
+    def _poll_computer(self) -> None:
+        '''
+        Shows the computer player's progress and plays its move once the
+        search is done. Runs every AI_POLL_MS milliseconds.
+        '''
+        for handle in self._ai_worker.poll():
+            if handle is not self._ai_job:
+                continue
+
+            if handle.finished:
+                self._ai_job = None
+
+                if not handle.pondering and handle.square is not None:
+                    self._play_move(*divmod(handle.square, self._game.no_of_col()))
+            elif handle.square is not None:
+                row_index, col_index = divmod(handle.square, self._game.no_of_col())
+                self.ai_status.set("Computer is {}: depth {}, best {}{}, {:,.0f} nodes/sec".format(
+                    "pondering" if handle.pondering else "thinking", handle.depth,
+                    chr(ord('a') + col_index), row_index + 1, handle.nodes_per_second))
+
+        self._root_window.after(OthelloApplication.AI_POLL_MS, self._poll_computer)
+
+    def _update_overlay(self) -> None:
+        '''
+        Shows the latest instrumentation stats. Runs every OVERLAY_MS milliseconds.
+        '''
+        self._gameboard_display.itemconfigure(self._overlay, text = instrumentation.overlay_text())
+        self._gameboard_display.tag_raise(self._overlay)
+        self._root_window.after(OthelloApplication.OVERLAY_MS, self._update_overlay)
+
+    def _toggle_overlay(self, event: tkinter.Event) -> None:
+        hidden = self._gameboard_display.itemcget(self._overlay, 'state') == tkinter.HIDDEN
+        self._gameboard_display.itemconfigure(self._overlay,
+                                              state = tkinter.NORMAL if hidden else tkinter.HIDDEN)
+
+    def _close(self) -> None:
+        '''
+        Stops the computer player's worker and closes the window.
+        '''
+        self._ai_worker.close()
+        self._root_window.destroy()
+
+    def _refresh_game_window(self, event: tkinter.Event):
+        '''
+        Brings the labels up to date and fits the drawn cells and
+        discs to the current size of the canvas.
+        '''
+        self.black_score.set("Black's Score: " + \
+                             str(self._game.black_score()))
+        self.white_score.set("White's Score: " + \
+                             str(self._game.white_score()))
+
+        if self._game.get_winner() != None:
+            self.msg_text.set("Winner: " + \
+                              game_classes.GameState.player_to_string(
+                              self._game.get_winner()))
+        else:
+            self.msg_text.set("Player's Turn: " + \
+                              game_classes.GameState.player_to_string(
+                              self._game.player_making_move()))
+        
+        self._renderer.fit_to_canvas()
+
+    def _disc_display(self) -> cartesian.CircleState:
+        '''
+        Creates the state of the existing circles, which resemble
+        the discs, based on the GameState.
+        '''
+        gameboard_circles = cartesian.CircleState()
+        self._update_disc_display(gameboard_circles,
+                                  [(row_index, col_index)
+                                   for row_index in range(self._game.no_of_rows())
+                                   for col_index in range(self._game.no_of_col())])
+        return gameboard_circles
+
+    def _update_disc_display(self, gameboard_circles: cartesian.CircleState,
+                             grid_coords: [(int)]) -> None:
+        '''
+        Brings the circles at the given (row, col) grid coordinates up
+        to date with the discs in the GameState.
+        '''
+        rows_of_cells = self._game.get_rows_of_cells()
+        rects = self._gameboard_rectangles.all_rects()
+        no_of_col = self._game.no_of_col()
+
+        for row_index, col_index in grid_coords:
+            content = rows_of_cells[row_index][col_index].cell_content()
+
+            if content == game_classes.BLACK or content == game_classes.WHITE:
+                # Use the points of the corresponding rectangle
+                # to determine the points of the new circle.
+                rect_points = rects[cartesian.grid_coord_to_index(row_index, col_index, no_of_col)].get_points()
+                color = 'black' if content == game_classes.BLACK else 'white'
+                gameboard_circles.put_circle((row_index, col_index),
+                                             cartesian.Circle(rect_points[0], rect_points[1], color))
+            else:
+                gameboard_circles.remove_circle((row_index, col_index))
+
+    def _cell_display(self) -> cartesian.RectangleState:
+        '''
+        Creates a bunch of rectangles to be displayed as game
+        cells on the canvas.
+        '''
+        return cartesian.RectangleState.grid(self._game.no_of_rows(), self._game.no_of_col())
+    
+
+
+class CoalescedRedraw:
+    def __init__(self, widget: tkinter.Widget, redraw: "Function", max_per_second: float) -> None:
+        '''
+        Turns bursts of redraw requests, such as the Configure events sent
+        while a window edge is dragged, into at most one call of redraw per
+        frame interval. The call is scheduled on the widget's event loop, so
+        requests return at once. Requests which arrive while a redraw is
+        already scheduled are dropped and counted.
+        '''
+        self._widget = widget
+        self._redraw = redraw
+        self._frame_interval = 1/max_per_second
+        self._last_redraw = 0.0
+        self._scheduled = None
+        self._redraws = 0
+        self._dropped = 0
+
+    def request(self, event: tkinter.Event = None) -> None:
+        '''
+        Asks for a redraw. It happens once the event loop is idle, but not
+        sooner than one frame interval after the previous redraw.
+        '''
+        if self._scheduled is not None:
+            self._dropped += 1
+            return
+
+        wait = self._last_redraw + self._frame_interval - time.perf_counter()
+
+        if wait <= 0:
+            self._scheduled = self._widget.after_idle(self._run)
+        else:
+            self._scheduled = self._widget.after(int(wait*1000) + 1, self._run)
+
+    def cancel(self) -> None:
+        '''
+        Cancels a scheduled redraw, if any.
+        '''
+        if self._scheduled is not None:
+            self._widget.after_cancel(self._scheduled)
+            self._scheduled = None
+
+    def redraws(self) -> int:
+        '''
+        Returns the number of redraws made.
+        '''
+        return self._redraws
+
+    def dropped_frames(self) -> int:
+        '''
+        Returns the number of requests merged into an already scheduled redraw.
+        '''
+        return self._dropped
+
+    def counts(self) -> {str: int}:
+        '''
+        Returns the redraws made and the frames dropped, for instrumentation.
+        '''
+        return {'redraws': self._redraws, 'dropped_frames': self._dropped}
+
+    def _run(self) -> None:
+        self._scheduled = None
+        self._last_redraw = time.perf_counter()
+        self._redraws += 1
+        self._redraw()
+
+
+class BoardRenderer:
+    def __init__(self, canvas: tkinter.Canvas, rectangles: cartesian.RectangleState,
+                 circles: cartesian.CircleState, no_of_col: int) -> None:
+        '''
+        Draws the gameboard on a canvas. A rectangle and an oval are created
+        once for every cell; afterwards the ovals are only recolored, and
+        on a resize every item is moved rather than drawn again.
+        '''
+        self._canvas = canvas
+        self._rectangles = rectangles.all_rects()
+        self._circles = circles
+        self._no_of_col = no_of_col
+
+        self._rect_items = [self._draw_rect(rect) for rect in self._rectangles]
+
+        # The ovals go on top of the rectangles. An empty cell's oval is hidden.
+        self._oval_items = [self._draw_oval(rect) for rect in self._rectangles]
+        self._oval_colors = [None] * len(self._rectangles)
+        self._drawn_size = (canvas.winfo_width(), canvas.winfo_height())
+        self.recolor_discs([divmod(index, self._no_of_col) for index in range(len(self._rectangles))])
+
+    def recolor_discs(self, addresses: [(int)]) -> None:
+        '''
+        Updates the discs shown in the cells at the given (row, col)
+        addresses to match the circles.
+        '''
+        for row_index, col_index in addresses:
+            index = row_index*self._no_of_col + col_index
+            circle = self._circles.circle_at((row_index, col_index))
+            color = None if circle is None else circle.get_color()
+
+            if color != self._oval_colors[index]:
+                if color is None:
+                    self._canvas.itemconfigure(self._oval_items[index], state = tkinter.HIDDEN)
+                else:
+                    self._canvas.itemconfigure(self._oval_items[index], fill = color,
+                                               state = tkinter.NORMAL)
+
+                self._oval_colors[index] = color
+
+    def fit_to_canvas(self) -> None:
+        '''
+        Moves every item to fit the canvas's current size. Nothing is
+        done if the size has not changed since the last call.
+        '''
+        size = (self._canvas.winfo_width(), self._canvas.winfo_height())
+
+        if size == self._drawn_size:
+            return
+
+        for index, rect in enumerate(self._rectangles):
+            corners = self._px_corners(rect, size)
+            self._canvas.coords(self._rect_items[index], *corners)
+            self._canvas.coords(self._oval_items[index], *corners)
+
+        self._drawn_size = size
+
+    def _px_corners(self, shape: "Rectangle", size: (int)) -> (int):
+        '''
+        Returns the pixel coordinates of a shape's two corner points.
+        '''
+        p1, p2 = shape.get_points()
+        return p1.px_coord(*size) + p2.px_coord(*size)
+
+    def _draw_oval(self, rect: "Rectangle") -> int:
+        '''
+        Creates a hidden oval filling the rectangle and returns its item id.
+        '''
+        size = (self._canvas.winfo_width(), self._canvas.winfo_height())
+        return self._canvas.create_oval(*self._px_corners(rect, size), state = tkinter.HIDDEN)
+
+    def _draw_rect(self, rect: "Rectangle") -> int:
+        '''
+        Creates the rectangle on the canvas and returns its item id.
+        '''
+        size = (self._canvas.winfo_width(), self._canvas.winfo_height())
+        return self._canvas.create_rectangle(*self._px_corners(rect, size),
+                                             fill = rect.get_color(),
+                                             outline = rect.get_border_color())
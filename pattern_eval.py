@@ -0,0 +1,296 @@
+import array
+import functools
+import struct
+import sys
+import binary_records
+from game_classes import BLACK, WHITE, InvalidSetting
+
+
+# A pattern is a short line of squares, such as an edge or a diagonal, read
+# outwards from a corner. Its index is the base-3 number whose digits are
+# the contents of its squares: 0 for empty, 1 for the player whose view is
+# taken and 2 for the other player. Each pattern class has one table of
+# weights, shared by all the patterns of that class, which gives the value
+# of every index. A position is worth the sum of its patterns' weights, so
+# evaluating it costs the same however large the board is.
+#
+# A weights file holds a WEIGHTS_HEADER followed by each class's table of
+# 3 ** length little-endian 32-bit floats, in the order of PatternSet.classes:
+#
+#     magic, rows, columns, winner mode, number of classes
+#     pattern length of each class        one byte each
+
+MAGIC = b'OTPW'
+WEIGHTS_HEADER = struct.Struct('<4sBBBB')
+MAX_LINE = 8            # Longest edge or diagonal pattern
+
+
+class InvalidWeights(Exception):
+    pass
+
+
+class PatternSet:
+    '''
+    The patterns of a board of a particular size: a 3x3 block, the two
+    edges and the diagonal leading away from each corner.
+    '''
+    def __init__(self, rows: int, col: int) -> None:
+        self.rows = rows
+        self.col = col
+        self.classes = []       # (name, length) of each class
+        self.patterns = []      # (class number, squares) of each pattern
+
+        for corner_row, row_step in ((0, 1), (rows - 1, -1)):
+            for corner_col, col_step in ((0, 1), (col - 1, -1)):
+                def square(row_offset: int, col_offset: int) -> int:
+                    return (corner_row + row_offset*row_step)*col + corner_col + col_offset*col_step
+
+                self._add('corner', [square(r, c) for r in range(3) for c in range(3)])
+                self._add('edge', [square(0, c) for c in range(min(col, MAX_LINE))])
+                self._add('edge', [square(r, 0) for r in range(min(rows, MAX_LINE))])
+                self._add('diagonal', [square(k, k) for k in range(min(rows, col, MAX_LINE))])
+
+        # Each square lists the (pattern, power of 3) of every pattern it is in.
+        self.square_patterns = [[] for square in range(rows*col)]
+
+        for pattern, (class_number, squares) in enumerate(self.patterns):
+            for position, square in enumerate(squares):
+                self.square_patterns[square].append((pattern, 3**position))
+
+        # Swapping the digits 1 and 2 gives the index seen by the other player.
+        self.swapped = {}
+
+        for name, length in self.classes:
+            if length not in self.swapped:
+                self.swapped[length] = array.array('l', (_swap_digits(index, length)
+                                                         for index in range(3**length)))
+
+    def _add(self, name: str, squares: [int]) -> None:
+        if (name, len(squares)) not in self.classes:
+            self.classes.append((name, len(squares)))
+
+        self.patterns.append((self.classes.index((name, len(squares))), tuple(squares)))
+
+    def indices_of(self, own: int, opp: int) -> [int]:
+        '''
+        Returns the index of every pattern, taking the view of the owner
+        of the discs in own.
+        '''
+        indices = []
+
+        for class_number, squares in self.patterns:
+            index = 0
+
+            for square in reversed(squares):
+                index = 3*index + (own >> square & 1) + 2*(opp >> square & 1)
+
+            indices.append(index)
+
+        return indices
+
+
+def _swap_digits(index: int, length: int) -> int:
+    swapped = 0
+    power = 1
+
+    for position in range(length):
+        digit = index % 3
+        swapped += power * (3 - digit if digit else 0)
+        index //= 3
+        power *= 3
+
+    return swapped
+
+
+@functools.cache
+def pattern_set(rows: int, col: int) -> PatternSet:
+    '''
+    Returns the shared PatternSet for the given board dimensions.
+    '''
+    return PatternSet(rows, col)
+
+
+class PatternWeights:
+    '''
+    The weight tables of every pattern class for one board size and
+    winner mode. A weight is the expected final disc margin, with the sign
+    flipped in the '<' mode, for the player whose view is taken.
+    '''
+    def __init__(self, rows: int, col: int, winner_mode: str, tables: [array.array] = None) -> None:
+        if winner_mode not in binary_records.MODE_CODES:
+            raise InvalidSetting
+
+        self.rows = rows
+        self.col = col
+        self.winner_mode = winner_mode
+        self.patterns = pattern_set(rows, col)
+
+        if tables is None:
+            tables = [array.array('f', bytes(4 * 3**length)) for name, length in self.patterns.classes]
+
+        self.tables = tables
+
+    @classmethod
+    def load(cls, path: str) -> "PatternWeights":
+        '''
+        Reads a weights file. Raises InvalidWeights if it is malformed.
+        '''
+        with open(path, 'rb') as weights_file:
+            data = weights_file.read()
+
+        try:
+            magic, rows, col, mode_code, no_of_classes = WEIGHTS_HEADER.unpack_from(data)
+        except struct.error:
+            raise InvalidWeights
+
+        if magic != MAGIC or mode_code not in binary_records.MODES:
+            raise InvalidWeights
+
+        patterns = pattern_set(rows, col)
+        lengths = tuple(data[WEIGHTS_HEADER.size:WEIGHTS_HEADER.size + no_of_classes])
+
+        if lengths != tuple(length for name, length in patterns.classes):
+            raise InvalidWeights
+
+        offset = WEIGHTS_HEADER.size + no_of_classes
+        tables = []
+
+        for length in lengths:
+            table = array.array('f')
+            table.frombytes(data[offset:offset + 4 * 3**length])
+
+            if len(table) != 3**length:
+                raise InvalidWeights
+
+            if sys.byteorder != 'little':
+                table.byteswap()
+
+            tables.append(table)
+            offset += 4 * 3**length
+
+        return cls(rows, col, binary_records.MODES[mode_code], tables)
+
+    def save(self, path: str) -> None:
+        '''
+        Writes the weights to a file.
+        '''
+        with open(path, 'wb') as weights_file:
+            weights_file.write(WEIGHTS_HEADER.pack(MAGIC, self.rows, self.col,
+                                                   binary_records.MODE_CODES[self.winner_mode],
+                                                   len(self.tables)))
+            weights_file.write(bytes(length for name, length in self.patterns.classes))
+
+            for table in self.tables:
+                if sys.byteorder != 'little':
+                    table = array.array('f', table)
+                    table.byteswap()
+
+                weights_file.write(table.tobytes())
+
+    def matches(self, rows: int, col: int, winner_mode: str) -> bool:
+        return (self.rows, self.col, self.winner_mode) == (rows, col, winner_mode)
+
+
+class PatternEvaluator:
+    '''
+    Evaluates positions with pattern weights. It can score a pair of disc
+    masks directly, or keep every pattern index up to date as discs are
+    placed, flipped and removed, either by following a GameBoard or
+    BitBoard after attach or by being told of each move with apply_move
+    and undo_move, as a search on disc masks does.
+    '''
+    def __init__(self, weights: PatternWeights) -> None:
+        self._weights = weights
+        self._patterns = weights.patterns
+        self._pattern_tables = [weights.tables[class_number]
+                                for class_number, squares in self._patterns.patterns]
+        self._pattern_swaps = [self._patterns.swapped[len(squares)]
+                               for class_number, squares in self._patterns.patterns]
+        self._indices = [0] * len(self._patterns.patterns)     # From black's view
+
+    def weights(self) -> PatternWeights:
+        return self._weights
+
+    def attach(self, board: "GameBoard") -> None:
+        '''
+        Starts following the given board, which must have the size the
+        weights were made for.
+        '''
+        if (board.no_of_rows(), board.no_of_col()) != (self._weights.rows, self._weights.col):
+            raise InvalidSetting
+
+        board.add_listener(self)
+        self.board_loaded(*board.disc_masks())
+
+    def evaluate(self, color: int) -> float:
+        '''
+        Returns the value of the followed board for the given color.
+        '''
+        if color == BLACK:
+            return sum(table[index] for table, index in zip(self._pattern_tables, self._indices))
+
+        return sum(table[swap[index]] for table, swap, index
+                   in zip(self._pattern_tables, self._pattern_swaps, self._indices))
+
+    def evaluate_masks(self, own: int, opp: int) -> float:
+        '''
+        Returns the value of a position for the owner of own.
+        '''
+        return sum(table[index] for table, index
+                   in zip(self._pattern_tables, self._patterns.indices_of(own, opp)))
+
+    def apply_move(self, square: int, flips: int, color: int) -> None:
+        '''
+        Brings the indices up to date after a disc of the given color is
+        placed on the square and the discs in the flips mask are flipped.
+        '''
+        self._change(square, flips, color, 1)
+
+    def undo_move(self, square: int, flips: int, color: int) -> None:
+        '''
+        Takes back a move given to apply_move.
+        '''
+        self._change(square, flips, color, -1)
+
+    def _change(self, square: int, flips: int, color: int, sign: int) -> None:
+        square_patterns = self._patterns.square_patterns
+        indices = self._indices
+        placed = sign if color == BLACK else 2*sign
+        flipped = sign if color == WHITE else -sign
+
+        for pattern, power in square_patterns[square]:
+            indices[pattern] += placed*power
+
+        while flips:
+            low_bit = flips & -flips
+
+            for pattern, power in square_patterns[low_bit.bit_length() - 1]:
+                indices[pattern] += flipped*power
+
+            flips ^= low_bit
+
+    # The methods below are called by the followed board.
+    def board_loaded(self, black: int, white: int) -> None:
+        self._indices = self._patterns.indices_of(black, white)
+
+    def disc_placed(self, square: int, color: int) -> None:
+        digit = 1 if color == BLACK else 2
+
+        for pattern, power in self._patterns.square_patterns[square]:
+            self._indices[pattern] += digit*power
+
+    def disc_removed(self, square: int, color: int) -> None:
+        digit = 1 if color == BLACK else 2
+
+        for pattern, power in self._patterns.square_patterns[square]:
+            self._indices[pattern] -= digit*power
+
+    def discs_flipped(self, squares: [int], color: int) -> None:
+        # A flip to white changes a digit from 1 to 2, and back for black.
+        sign = 1 if color == WHITE else -1
+        square_patterns = self._patterns.square_patterns
+        indices = self._indices
+
+        for square in squares:
+            for pattern, power in square_patterns[square]:
+                indices[pattern] += sign*power
@@ -0,0 +1,150 @@
+import argparse
+import random
+import time
+import binary_records
+import bitboard
+import game_classes
+import pattern_eval
+import replay
+
+
+def game_records(path: str) -> "Iterator":
+    '''
+    Yields (rows, columns, first player, top-left center disc, winner mode,
+    moves) for every game in a file of binary game records or of the JSON
+    lines written by tournament.py. Moves are row * columns + column.
+    '''
+    with open(path, 'rb') as record_file:
+        is_json = record_file.read(1) == b'{'
+
+    if is_json:
+        with open(path) as record_file:
+            for line_number, line in replay.numbered_records(record_file):
+                try:
+                    rows, col, first, topleft, mode, moves = replay.parse_record(line)
+                except (replay.InvalidRecord, ValueError, KeyError):
+                    continue
+
+                yield (rows, col, first, topleft, mode, [r*col + c for r, c in moves])
+    else:
+        with binary_records.GameRecordFile(path) as record_file:
+            yield from record_file
+
+
+def training_samples(records: "Iterable", rows: int, col: int, winner_mode: str) -> [([int], int)]:
+    '''
+    Replays every finished game of the given size and winner mode. Returns
+    a sample for each position in them: the pattern indices seen by the
+    player to move and that player's final disc margin, with the sign
+    flipped in the '<' mode. Games with an illegal move are skipped.
+    '''
+    patterns = pattern_eval.pattern_set(rows, col)
+    mode_sign = 1 if winner_mode == '>' else -1
+    samples = []
+
+    for record_rows, record_col, first, topleft, mode, moves in records:
+        if (record_rows, record_col, mode) != (rows, col, winner_mode):
+            continue
+
+        game = game_classes.GameState(first, mode, rows, col, topleft, bitboard.BitBoard)
+        positions = []
+
+        try:
+            for square in moves:
+                black, white = game.disc_masks()
+                player = game.player_making_move()
+
+                if player is None:
+                    raise game_classes.InvalidMoveError
+
+                if player == game_classes.BLACK:
+                    positions.append((black, white, player))
+                else:
+                    positions.append((white, black, player))
+
+                game.player_take_turn(*divmod(square, col))
+                game.next_player_turn()
+        except game_classes.InvalidMoveError:
+            continue
+
+        if game.get_winner() is None:
+            continue
+
+        black_margin = game.black_score() - game.white_score()
+
+        for own, opp, player in positions:
+            samples.append((patterns.indices_of(own, opp), mode_sign*player*black_margin))
+
+    return samples
+
+
+def fit(weights: pattern_eval.PatternWeights, samples: [([int], int)], epochs: int,
+        learning_rate: float, seed: int = 0) -> [float]:
+    '''
+    Fits the weights to the samples by stochastic gradient descent,
+    sharing each error out between the patterns of the sample. Returns
+    the mean absolute error of every epoch.
+    '''
+    patterns = weights.patterns
+    pattern_tables = [weights.tables[class_number] for class_number, squares in patterns.patterns]
+    step_scale = learning_rate / len(pattern_tables)
+    generator = random.Random(seed)
+    order = list(range(len(samples)))
+    errors = []
+
+    for epoch in range(epochs):
+        generator.shuffle(order)
+        total_error = 0.0
+
+        for sample in order:
+            indices, target = samples[sample]
+            error = target - sum(table[index] for table, index in zip(pattern_tables, indices))
+            total_error += abs(error)
+            step = step_scale * error
+
+            for table, index in zip(pattern_tables, indices):
+                table[index] += step
+
+        errors.append(total_error / max(len(samples), 1))
+
+    return errors
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description = "Fit pattern weights to self-play game records.")
+    parser.add_argument('output', help = "weights file to write")
+    parser.add_argument('records', nargs = '+',
+                        help = "binary game record files or tournament JSON lines files")
+    parser.add_argument('--size', default = '8x8', help = "board size such as 8x8")
+    parser.add_argument('--mode', choices = ('>', '<'), default = '>', help = "winner mode")
+    parser.add_argument('--epochs', type = int, default = 10, help = "passes over the samples")
+    parser.add_argument('--rate', type = float, default = 0.05, help = "learning rate")
+    parser.add_argument('--start', default = None, help = "weights file to continue training from")
+    args = parser.parse_args()
+
+    rows, col = game_classes.parse_size(args.size)
+
+    if args.start is None:
+        weights = pattern_eval.PatternWeights(rows, col, args.mode)
+    else:
+        weights = pattern_eval.PatternWeights.load(args.start)
+
+        if not weights.matches(rows, col, args.mode):
+            raise game_classes.InvalidSetting
+
+    start = time.perf_counter()
+    samples = []
+
+    for path in args.records:
+        samples.extend(training_samples(game_records(path), rows, col, args.mode))
+
+    print("Read {} positions in {:.1f}s".format(len(samples), time.perf_counter() - start))
+
+    for epoch, error in enumerate(fit(weights, samples, args.epochs, args.rate), 1):
+        print("epoch {:3}  mean absolute error {:8.3f}".format(epoch, error))
+
+    weights.save(args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import argparse
+import sys
+import time
+import bitboard
+import game_classes
+
+
+def perft(board: "GameBoard", color: int, depth: int, passed: bool = False) -> int:
+    '''
+    Counts the positions reached after exactly depth plies from the given
+    board with color to move. A pass counts as a ply, and a finished game
+    counts as a single position however many plies were left. Works with
+    any board type which has legal_moves, apply_move and undo_move.
+    '''
+    if depth == 0:
+        return 1
+
+    moves = board.legal_moves(color)
+
+    if not moves:
+        if passed:
+            return 1
+
+        return perft(board, -color, depth - 1, True)
+
+    if depth == 1:
+        return len(moves)
+
+    total = 0
+
+    for row_index, col_index in moves:
+        board.apply_move(row_index, col_index, color)
+        total += perft(board, -color, depth - 1)
+        board.undo_move()
+
+    return total
+
+
+# Counts from the starting position with black moving first, by board size.
+# Entry i is the count for depth i + 1. The two possible top-left center discs
+# give mirror images of each other, so both orientations share one list.
+REFERENCE_COUNTS = {
+    (4, 4): [4, 12, 44, 128, 424, 1256, 3624],
+    (4, 6): [4, 12, 50, 180, 798, 3338, 15418],
+    (4, 8): [4, 12, 50, 180, 808, 3472, 16844],
+    (4, 10): [4, 12, 50, 180, 808, 3472, 16854],
+    (4, 12): [4, 12, 50, 180, 808, 3472, 16854],
+    (4, 14): [4, 12, 50, 180, 808, 3472, 16854],
+    (4, 16): [4, 12, 50, 180, 808, 3472, 16854],
+    (6, 4): [4, 12, 50, 180, 798, 3338, 15418],
+    (6, 6): [4, 12, 56, 244, 1364, 7604, 47740],
+    (6, 8): [4, 12, 56, 244, 1380, 7892, 51246],
+    (6, 10): [4, 12, 56, 244, 1380, 7892, 51264],
+    (6, 12): [4, 12, 56, 244, 1380, 7892, 51264],
+    (6, 14): [4, 12, 56, 244, 1380, 7892, 51264],
+    (6, 16): [4, 12, 56, 244, 1380, 7892, 51264],
+    (8, 4): [4, 12, 50, 180, 808, 3472, 16844],
+    (8, 6): [4, 12, 56, 244, 1380, 7892, 51246],
+    (8, 8): [4, 12, 56, 244, 1396, 8200, 55092, 390216, 3005288],
+    (8, 10): [4, 12, 56, 244, 1396, 8200, 55136],
+    (8, 12): [4, 12, 56, 244, 1396, 8200, 55136],
+    (8, 14): [4, 12, 56, 244, 1396, 8200, 55136],
+    (8, 16): [4, 12, 56, 244, 1396, 8200, 55136],
+    (10, 4): [4, 12, 50, 180, 808, 3472, 16854],
+    (10, 6): [4, 12, 56, 244, 1380, 7892, 51264],
+    (10, 8): [4, 12, 56, 244, 1396, 8200, 55136],
+    (10, 10): [4, 12, 56, 244, 1396, 8200, 55180],
+    (10, 12): [4, 12, 56, 244, 1396, 8200, 55180],
+    (10, 14): [4, 12, 56, 244, 1396, 8200, 55180],
+    (10, 16): [4, 12, 56, 244, 1396, 8200, 55180],
+    (12, 4): [4, 12, 50, 180, 808, 3472, 16854],
+    (12, 6): [4, 12, 56, 244, 1380, 7892, 51264],
+    (12, 8): [4, 12, 56, 244, 1396, 8200, 55136],
+    (12, 10): [4, 12, 56, 244, 1396, 8200, 55180],
+    (12, 12): [4, 12, 56, 244, 1396, 8200, 55180],
+    (12, 14): [4, 12, 56, 244, 1396, 8200, 55180],
+    (12, 16): [4, 12, 56, 244, 1396, 8200, 55180],
+    (14, 4): [4, 12, 50, 180, 808, 3472, 16854],
+    (14, 6): [4, 12, 56, 244, 1380, 7892, 51264],
+    (14, 8): [4, 12, 56, 244, 1396, 8200, 55136],
+    (14, 10): [4, 12, 56, 244, 1396, 8200, 55180],
+    (14, 12): [4, 12, 56, 244, 1396, 8200, 55180],
+    (14, 14): [4, 12, 56, 244, 1396, 8200, 55180],
+    (14, 16): [4, 12, 56, 244, 1396, 8200, 55180],
+    (16, 4): [4, 12, 50, 180, 808, 3472, 16854],
+    (16, 6): [4, 12, 56, 244, 1380, 7892, 51264],
+    (16, 8): [4, 12, 56, 244, 1396, 8200, 55136],
+    (16, 10): [4, 12, 56, 244, 1396, 8200, 55180],
+    (16, 12): [4, 12, 56, 244, 1396, 8200, 55180],
+    (16, 14): [4, 12, 56, 244, 1396, 8200, 55180],
+    (16, 16): [4, 12, 56, 244, 1396, 8200, 55180],
+}
+
+
+def check(depth: int, board_types: [type], sizes: [(int)] = None) -> bool:
+    '''
+    Runs perft on every size in REFERENCE_COUNTS (or the given sizes) for
+    both orientations and every board type, comparing each count with the
+    reference. Prints the counts and speeds. Returns whether all matched.
+    '''
+    all_matched = True
+
+    for rows, col in sizes or sorted(REFERENCE_COUNTS):
+        expected = REFERENCE_COUNTS.get((rows, col), [])
+
+        for top_left_center_disc in (game_classes.BLACK, game_classes.WHITE):
+            for board_type in board_types:
+                for current_depth in range(1, depth + 1):
+                    board = board_type(rows, col, top_left_center_disc)
+                    start = time.perf_counter()
+                    count = perft(board, game_classes.BLACK, current_depth)
+                    elapsed = time.perf_counter() - start
+
+                    if current_depth <= len(expected):
+                        matched = count == expected[current_depth - 1]
+                        status = "ok" if matched else "MISMATCH (expected {})".format(
+                            expected[current_depth - 1])
+                        all_matched = all_matched and matched
+                    else:
+                        status = "no reference"
+
+                    print("{}x{} topleft={} {:10} depth {:2} {:12} nodes {:10.3f}s "
+                          "{:12.0f} nodes/sec  {}".format(
+                              rows, col, game_classes.GameState.player_to_string(top_left_center_disc),
+                              board_type.__name__, current_depth, count, elapsed,
+                              count/elapsed if elapsed > 0 else 0.0, status))
+
+    return all_matched
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description = "Count and check Othello move-generation trees.")
+    parser.add_argument('--depth', type = int, default = 5, help = "deepest depth to count")
+    parser.add_argument('--board', choices = ('gameboard', 'bitboard', 'both'), default = 'both',
+                        help = "board implementation to test")
+    parser.add_argument('--sizes', default = None,
+                        help = "comma-separated sizes such as 8x8,6x10 (default: all with references)")
+    args = parser.parse_args()
+
+    board_types = {'gameboard': [game_classes.GameBoard], 'bitboard': [bitboard.BitBoard],
+                   'both': [game_classes.GameBoard, bitboard.BitBoard]}[args.board]
+    sizes = None
+
+    if args.sizes is not None:
+        sizes = [game_classes.parse_size(size) for size in args.sizes.split(',')]
+
+    if not check(args.depth, board_types, sizes):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+import argparse
+import functools
+import itertools
+import json
+import multiprocessing
+import re
+import sys
+import bitboard
+import game_classes
+from game_classes import COLORS
+
+
+# A game record is one line of text:
+#
+#     <rows>x<col> <first player> <top-left center disc> <winner mode> <moves>
+#
+# for example "8x8 B W > f5d6c3d3c4". Players and discs are B or W, the winner
+# mode is > or <, and each move is a column letter (a-p) followed by a row
+# number (1-16). Spaces between moves are allowed. The JSON lines written by
+# tournament.py are accepted too. Empty lines and lines starting with # are
+# skipped.
+
+MOVE_PATTERN = re.compile(r'([a-p])(1[0-6]|[1-9])')
+BATCH_LINES = 4096      # Lines handed to the worker processes at a time
+
+
+class InvalidRecord(Exception):
+    pass
+
+
+def move_to_text(row_index: int, col_index: int) -> str:
+    '''
+    Converts a cell address into a move such as "d3".
+    '''
+    return chr(ord('a') + col_index) + str(row_index + 1)
+
+
+def text_to_moves(text: str) -> [(int)]:
+    '''
+    Converts a string of moves such as "f5d6c3" into (row, col) addresses.
+    '''
+    text = text.replace(" ", "")
+    moves = []
+    position = 0
+
+    while position < len(text):
+        match = MOVE_PATTERN.match(text, position)
+
+        if match is None:
+            raise InvalidRecord
+
+        moves.append((int(match.group(2)) - 1, ord(match.group(1)) - ord('a')))
+        position = match.end()
+
+    return moves
+
+
+def parse_record(line: str) -> (int, int, int, int, str, [(int)]):
+    '''
+    Reads a game record line. Returns the rows, columns, first player,
+    top-left center disc, winner mode and moves.
+    '''
+    if line.startswith('{'):
+        record = json.loads(line)
+        rows, col = record['rows'], record['col']
+        first, topleft, mode = record['first'], record['topleft'], record['mode']
+
+        if not all(_is_int(value) for value in (rows, col)) \
+           or not all(isinstance(value, str) for value in (first, topleft, mode)) \
+           or not isinstance(record['moves'], list) or not all(_is_int(square) for square in record['moves']) \
+           or not game_classes.valid_size(rows, col):
+            raise InvalidRecord
+
+        moves = [divmod(square, col) for square in record['moves']]
+    else:
+        fields = line.split(None, 4)
+
+        if len(fields) < 4:
+            raise InvalidRecord
+
+        size, first, topleft, mode = fields[:4]
+
+        try:
+            rows, col = game_classes.parse_size(size)
+        except game_classes.InvalidSetting:
+            raise InvalidRecord
+
+        moves = text_to_moves(fields[4]) if len(fields) == 5 else []
+
+    if first not in COLORS or topleft not in COLORS or mode not in game_classes.WINNER_MODES \
+       or not game_classes.valid_size(rows, col):
+        raise InvalidRecord
+
+    return (rows, col, COLORS[first], COLORS[topleft], mode, moves)
+
+
+def _is_int(value: object) -> bool:
+    '''
+    Tells whether a value read from JSON is an integer. JSON's true and
+    false come back as bools, which Python counts as integers.
+    '''
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def replay_line(numbered_line: (int, str), board_type: type = bitboard.BitBoard) -> str:
+    '''
+    Replays one game record through GameState and describes the result as
+    a tab-separated line: line number, status, black's score, white's score,
+    winner and details. The status is OK, UNFINISHED, ILLEGAL or INVALID.
+    '''
+    line_number, line = numbered_line
+
+    try:
+        rows, col, first, topleft, mode, moves = parse_record(line)
+    except (InvalidRecord, ValueError, KeyError):
+        return "{}\tINVALID\t\t\t\tunreadable record".format(line_number)
+
+    game = game_classes.GameState(first, mode, rows, col, topleft, board_type)
+
+    for ply, (row_index, col_index) in enumerate(moves):
+        if game.get_winner() is not None:
+            detail = "move {} ({}) after the end of the game".format(
+                ply + 1, move_to_text(row_index, col_index))
+            return _result_line(line_number, "ILLEGAL", game, detail)
+
+        if not (0 <= row_index < rows and 0 <= col_index < col):
+            detail = "move {} ({}) is off the board".format(ply + 1, move_to_text(row_index, col_index))
+            return _result_line(line_number, "ILLEGAL", game, detail)
+
+        try:
+            game.player_take_turn(row_index, col_index)
+        except game_classes.InvalidMoveError:
+            detail = "move {} ({}) by {} is not legal".format(
+                ply + 1, move_to_text(row_index, col_index),
+                game_classes.GameState.player_to_string(game.player_making_move()))
+            return _result_line(line_number, "ILLEGAL", game, detail)
+
+        game.next_player_turn()
+
+    if game.get_winner() is None:
+        return _result_line(line_number, "UNFINISHED", game, "")
+
+    return _result_line(line_number, "OK", game, "")
+
+
+def _result_line(line_number: int, status: str, game: "GameState", detail: str) -> str:
+    '''
+    Formats the outcome of replaying one record.
+    '''
+    if game.get_winner() is None:
+        winner = ""
+    else:
+        winner = game_classes.GameState.player_to_string(game.get_winner())
+
+    return "{}\t{}\t{}\t{}\t{}\t{}".format(line_number, status, game.black_score(),
+                                           game.white_score(), winner, detail)
+
+
+def numbered_records(lines: "Iterable") -> "Iterator":
+    '''
+    Yields (line number, line) for every line holding a record, reading
+    the lines one at a time.
+    '''
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+
+        if line and not line.startswith('#'):
+            yield (line_number, line)
+
+
+def replay_file(lines: "Iterable", output: "TextIO", processes: int = 1,
+                board_type: type = bitboard.BitBoard) -> {str: int}:
+    '''
+    Replays every record in lines, writing one result line per record to
+    output in input order. With more than one process, batches of records
+    are validated in parallel; only one batch is held in memory at a time.
+    Returns the number of records with each status.
+    '''
+    counts = {"OK": 0, "UNFINISHED": 0, "ILLEGAL": 0, "INVALID": 0}
+    records = numbered_records(lines)
+    replay = functools.partial(replay_line, board_type = board_type)
+
+    if processes == 1:
+        for numbered_line in records:
+            _write_result(replay(numbered_line), output, counts)
+
+        return counts
+
+    with multiprocessing.Pool(processes) as pool:
+        while True:
+            batch = list(itertools.islice(records, BATCH_LINES))
+
+            if len(batch) == 0:
+                break
+
+            for result in pool.imap(replay, batch, chunksize = 64):
+                _write_result(result, output, counts)
+
+    return counts
+
+
+def _write_result(result: str, output: "TextIO", counts: {str: int}) -> None:
+    output.write(result + "\n")
+    counts[result.split("\t")[1]] += 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description = "Replay and validate Othello game records.")
+    parser.add_argument('records', help = "file with one game record per line, or - for stdin")
+    parser.add_argument('--processes', type = int, default = 1,
+                        help = "validate in parallel with this many processes (0 for one per core)")
+    parser.add_argument('--reference', action = 'store_true',
+                        help = "replay on the Cell-based GameBoard instead of the bitboard")
+    args = parser.parse_args()
+    processes = args.processes if args.processes > 0 else multiprocessing.cpu_count()
+    board_type = game_classes.GameBoard if args.reference else bitboard.BitBoard
+
+    if args.records == '-':
+        counts = replay_file(sys.stdin, sys.stdout, processes, board_type)
+    else:
+        with open(args.records) as record_file:
+            counts = replay_file(record_file, sys.stdout, processes, board_type)
+
+    sys.stderr.write(" ".join("{} {}".format(status, count) for status, count in counts.items()) + "\n")
+
+    if counts["ILLEGAL"] or counts["INVALID"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
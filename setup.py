@@ -1,5 +1,26 @@
-from distutils.core import setup
-import py2exe
-setup(options = {'py2exe': {'bundle_files': 2, 'compressed': True}},
-      zipfile = None,
-      windows=['cartesian.py', 'game_classes.py', 'othello_interface.py'])
\ No newline at end of file
+import sys
+from setuptools import setup
+
+
+# The game modules install as a plain library with no GUI dependencies at
+# import time. py2exe is only needed, and only imported, to build the
+# Windows executable with "python setup.py py2exe".
+windows_options = {}
+
+if 'py2exe' in sys.argv:
+    import py2exe
+
+    windows_options = {'options': {'py2exe': {'bundle_files': 2, 'compressed': True}},
+                       'zipfile': None,
+                       'windows': ['cartesian.py', 'game_classes.py', 'othello_interface.py']}
+
+setup(name = 'othello',
+      version = '1.0',
+      description = "Othello for any even board size, with a computer player",
+      py_modules = ['game_classes', 'cartesian', 'bitboard', 'transposition', 'othello_ai',
+                    'endgame', 'opening_book', 'pattern_eval', 'pattern_trainer',
+                    'binary_records', 'replay', 'tournament', 'perft', 'numpy_board',
+                    'ai_worker', 'analysis_server', 'benchmarks', 'instrumentation',
+                    'othello_interface', 'othello_gui'],
+      extras_require = {'numpy': ['numpy']},
+      **windows_options)
@@ -0,0 +1,6 @@
+import os
+import sys
+
+
+# The game modules are top-level modules in the directory above the tests.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,116 @@
+import array
+import random
+import pytest
+import bitboard
+import game_classes
+import pattern_eval
+
+
+# GameBoard is the reference implementation. BitBoard must behave the same
+# through any mix of moves made with player_take_turn, apply_move and
+# undo_move, on square and oblong boards.
+SIZES = ((4, 4), (6, 10), (8, 8), (10, 6), (16, 16))
+STEPS = 200
+
+
+def _state(game: game_classes.GameState) -> tuple:
+    '''
+    Describes everything about a game the two board types must agree on.
+    Flips may be listed in any order, so they are compared as sets.
+    '''
+    return (game.disc_masks(), game.zobrist_hash(), game.black_score(), game.white_score(),
+            game.player_making_move(), game.get_winner(),
+            {move: frozenset(flips) for move, flips in game.legal_moves().items()})
+
+
+def _random_walk(size: (int), seed: int):
+    '''
+    Plays the same random moves and take-backs on a game of each board
+    type, yielding both games after every step.
+    '''
+    generator = random.Random(seed)
+    games = [game_classes.GameState(game_classes.BLACK, '>', *size, game_classes.WHITE, board_type)
+             for board_type in (game_classes.GameBoard, bitboard.BitBoard)]
+    applied = 0
+
+    for step in range(STEPS):
+        action = generator.random()
+
+        if applied and (games[0].get_winner() is not None or action < 0.3):
+            for game in games:
+                game.undo_move()
+
+            applied -= 1
+        elif games[0].get_winner() is not None:
+            break
+        elif action < 0.4 and applied == 0:
+            # player_take_turn cannot be undone, so it is only used while
+            # there is nothing to take back.
+            move = generator.choice(sorted(games[0].legal_moves()))
+
+            for game in games:
+                game.player_take_turn(*move)
+                game.next_player_turn()
+        else:
+            move = generator.choice(sorted(games[0].legal_moves()))
+
+            for game in games:
+                game.apply_move(*move)
+
+            applied += 1
+
+        yield games
+
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('size', SIZES, ids = lambda size: '{}x{}'.format(*size))
+def test_bitboard_matches_gameboard(size: (int), seed: int) -> None:
+    for reference, bits in _random_walk(size, seed):
+        assert _state(bits) == _state(reference)
+
+
+@pytest.mark.parametrize('size', SIZES, ids = lambda size: '{}x{}'.format(*size))
+def test_undo_restores_the_position(size: (int)) -> None:
+    for board_type in (game_classes.GameBoard, bitboard.BitBoard):
+        generator = random.Random(7)
+        game = game_classes.GameState(game_classes.BLACK, '<', *size, game_classes.BLACK, board_type)
+        history = []
+
+        while game.get_winner() is None and len(history) < 40:
+            history.append(_state(game))
+            game.apply_move(*generator.choice(sorted(game.legal_moves())))
+
+        while history:
+            game.undo_move()
+            assert _state(game) == history.pop()
+
+
+@pytest.mark.parametrize('size', ((8, 8), (6, 10)), ids = lambda size: '{}x{}'.format(*size))
+def test_attached_evaluator_follows_both_boards(size: (int)) -> None:
+    generator = random.Random(3)
+    patterns = pattern_eval.pattern_set(*size)
+    tables = [array.array('f', (generator.uniform(-1, 1) for index in range(3**length)))
+              for name, length in patterns.classes]
+    evaluator = pattern_eval.PatternEvaluator(pattern_eval.PatternWeights(*size, '>', tables))
+
+    for board_type in (game_classes.GameBoard, bitboard.BitBoard):
+        board = board_type(*size, game_classes.WHITE)
+        evaluator.attach(board)
+        color = game_classes.BLACK
+        made = []
+
+        for step in range(60):
+            if made and step % 3 == 2:
+                board.undo_move()
+                color = made.pop()
+            elif board.legal_moves(color):
+                board.apply_move(*generator.choice(sorted(board.legal_moves(color))), color)
+                made.append(color)
+                color = -color
+            else:
+                color = -color
+                continue
+
+            black, white = board.disc_masks()
+            assert evaluator.evaluate(game_classes.BLACK) == pytest.approx(evaluator.evaluate_masks(black, white))
+            assert evaluator.evaluate(game_classes.WHITE) == pytest.approx(evaluator.evaluate_masks(white, black))
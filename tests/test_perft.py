@@ -0,0 +1,40 @@
+import pytest
+import bitboard
+import game_classes
+import perft
+
+
+# Every size is counted to a small depth on both board types, and 8x8 deeper,
+# so any change to move generation, flipping or undoing moves is checked
+# against the reference counts.
+DEPTH = 4
+DEEP_SIZE = (8, 8)
+DEEP_DEPTH = 6
+
+BOARD_TYPES = (game_classes.GameBoard, bitboard.BitBoard)
+
+
+@pytest.mark.parametrize('board_type', BOARD_TYPES, ids = lambda board_type: board_type.__name__)
+@pytest.mark.parametrize('top_left_center_disc', (game_classes.BLACK, game_classes.WHITE),
+                         ids = ('topleft=B', 'topleft=W'))
+@pytest.mark.parametrize('size', sorted(perft.REFERENCE_COUNTS), ids = lambda size: '{}x{}'.format(*size))
+def test_perft_matches_reference(size: (int), top_left_center_disc: int, board_type: type) -> None:
+    expected = perft.REFERENCE_COUNTS[size]
+
+    for depth in range(1, DEPTH + 1):
+        board = board_type(*size, top_left_center_disc)
+        assert perft.perft(board, game_classes.BLACK, depth) == expected[depth - 1]
+
+
+@pytest.mark.parametrize('board_type', BOARD_TYPES, ids = lambda board_type: board_type.__name__)
+def test_perft_deep(board_type: type) -> None:
+    board = board_type(*DEEP_SIZE, game_classes.WHITE)
+    assert perft.perft(board, game_classes.BLACK, DEEP_DEPTH) == perft.REFERENCE_COUNTS[DEEP_SIZE][DEEP_DEPTH - 1]
+
+
+def test_perft_leaves_the_board_unchanged() -> None:
+    for board_type in BOARD_TYPES:
+        board = board_type(6, 6, game_classes.BLACK)
+        before = (board.disc_masks(), board.zobrist_hash())
+        perft.perft(board, game_classes.BLACK, 5)
+        assert (board.disc_masks(), board.zobrist_hash()) == before
@@ -0,0 +1,233 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import time
+import bitboard
+import game_classes
+import othello_ai
+from game_classes import COLORS, COLOR_NAMES
+
+
+class GameConfig:
+    '''
+    One rule variant to play games under.
+    '''
+    def __init__(self, rows: int, col: int, first_to_move: int,
+                 top_left_center_disc: int, winner_mode: str) -> None:
+        self.rows = rows
+        self.col = col
+        self.first_to_move = first_to_move
+        self.top_left_center_disc = top_left_center_disc
+        self.winner_mode = winner_mode
+
+    def name(self) -> str:
+        '''
+        Names the configuration, e.g. "8x8 first=B topleft=W mode=>".
+        '''
+        return "{}x{} first={} topleft={} mode={}".format(
+            self.rows, self.col, COLOR_NAMES[self.first_to_move],
+            COLOR_NAMES[self.top_left_center_disc], self.winner_mode)
+
+
+def play_game(job: (str, GameConfig, int, int, int)) -> dict:
+    '''
+    Plays one game headlessly and returns its result. The job gives the
+    game's id, its configuration, a random seed, the number of opening
+    plies to play at random and the search depth of both players (0 for
+    random players).
+    '''
+    game_id, config, seed, random_plies, depth = job
+    generator = random.Random(seed)
+    start = time.perf_counter()
+    game = game_classes.GameState(config.first_to_move, config.winner_mode, config.rows,
+                                  config.col, config.top_left_center_disc, bitboard.BitBoard)
+    player = othello_ai.AIPlayer(time_budget = None, max_depth = depth, hash_megabytes = 1)
+    moves = []
+
+    while game.get_winner() is None:
+        if len(moves) < random_plies or depth == 0:
+            row_index, col_index = generator.choice(sorted(game.legal_moves()))
+        else:
+            row_index, col_index = player.choose_move(game)
+
+        game.player_take_turn(row_index, col_index)
+        game.next_player_turn()
+        moves.append(row_index * config.col + col_index)
+
+    return {'id': game_id, 'config': config.name(), 'rows': config.rows, 'col': config.col,
+            'first': COLOR_NAMES[config.first_to_move],
+            'topleft': COLOR_NAMES[config.top_left_center_disc],
+            'mode': config.winner_mode, 'winner': COLOR_NAMES[game.get_winner()],
+            'black': game.black_score(), 'white': game.white_score(),
+            'moves': moves, 'seconds': time.perf_counter() - start}
+
+
+def completed_results(path: str) -> [dict]:
+    '''
+    Reads the results already written to the given file. A line cut off by
+    an interrupted run is skipped, so that game will be played again.
+    '''
+    results = []
+
+    if not os.path.exists(path):
+        return results
+
+    with open(path) as result_file:
+        for line in result_file:
+            try:
+                results.append(json.loads(line))
+            except ValueError:
+                pass
+
+    return results
+
+
+def run_tournament(configs: [GameConfig], games_per_config: int, path: str,
+                   processes: int = None, random_plies: int = 4, depth: int = 2) -> [dict]:
+    '''
+    Plays games_per_config games for every configuration across a pool of
+    processes, appending each result to the file at path as soon as it
+    finishes. Games already in the file are not played again. Returns
+    every result in the file and prints the speed of this run.
+    '''
+    results = completed_results(path)
+    done = set(result['id'] for result in results)
+    jobs = []
+
+    for config_index, config in enumerate(configs):
+        for game_index in range(games_per_config):
+            game_id = "{}#{}".format(config.name(), game_index)
+
+            if game_id not in done:
+                seed = config_index * 1000003 + game_index
+                jobs.append((game_id, config, seed, random_plies, depth))
+
+    start = time.perf_counter()
+
+    # Drop anything after the last complete line before appending.
+    if os.path.exists(path):
+        _truncate_partial_line(path)
+
+    with open(path, 'a') as result_file, multiprocessing.Pool(processes) as pool:
+        for result in pool.imap_unordered(play_game, jobs):
+            result_file.write(json.dumps(result) + "\n")
+            result_file.flush()
+            results.append(result)
+
+    elapsed = time.perf_counter() - start
+
+    if elapsed > 0:
+        print("Played {} games in {:.1f}s ({:.2f} games/sec)".format(
+            len(jobs), elapsed, len(jobs)/elapsed))
+
+    return results
+
+
+def _truncate_partial_line(path: str) -> None:
+    '''
+    Cuts the file back to its last newline.
+    '''
+    with open(path, 'rb+') as result_file:
+        end = result_file.seek(0, os.SEEK_END)
+
+        # Look backwards through the file a block at a time.
+        while end > 0:
+            start = max(0, end - 65536)
+            result_file.seek(start)
+            newline = result_file.read(end - start).rfind(b"\n")
+
+            if newline != -1:
+                result_file.truncate(start + newline + 1)
+                return
+
+            end = start
+
+        result_file.truncate(0)
+
+
+def summarize(results: [dict]) -> {str: {str: int}}:
+    '''
+    Counts the wins, draws and losses of the first player to move in
+    each configuration, along with the wins by color and the seconds
+    spent playing the games.
+    '''
+    summary = {}
+
+    for result in results:
+        counts = summary.setdefault(result['config'], {'games': 0, 'win': 0, 'draw': 0,
+                                                       'loss': 0, 'B': 0, 'W': 0, 'seconds': 0.0})
+        counts['games'] += 1
+        counts['seconds'] += result.get('seconds', 0.0)
+
+        if result['winner'] == '-':
+            counts['draw'] += 1
+        else:
+            counts[result['winner']] += 1
+
+            if result['winner'] == result['first']:
+                counts['win'] += 1
+            else:
+                counts['loss'] += 1
+
+    return summary
+
+
+def print_summary(summary: {str: {str: int}}) -> None:
+    '''
+    Prints the result counts as a table, with the first player's view
+    given as W/D/L. The games/sec of a configuration is for one worker
+    process, since the games of different configurations run side by side.
+    '''
+    for config_name in sorted(summary):
+        counts = summary[config_name]
+        games_per_second = counts['games']/counts['seconds'] if counts['seconds'] > 0 else 0.0
+        print("{:40} games {:6}  W/D/L {:5}/{:5}/{:5}  black {:5}  white {:5}  {:8.2f} games/sec".format(
+            config_name, counts['games'], counts['win'], counts['draw'], counts['loss'],
+            counts['B'], counts['W'], games_per_second))
+
+
+def _configs_from_args(args: argparse.Namespace) -> [GameConfig]:
+    '''
+    Builds every combination of the sizes, colors and modes on the command line.
+    '''
+    configs = []
+
+    for size, first, topleft, mode in itertools.product(args.sizes.split(','),
+                                                        args.first.split(','),
+                                                        args.topleft.split(','),
+                                                        args.modes.split(',')):
+        rows, col = game_classes.parse_size(size)
+
+        if mode not in game_classes.WINNER_MODES or first not in COLORS or topleft not in COLORS:
+            raise game_classes.InvalidSetting
+
+        configs.append(GameConfig(rows, col, COLORS[first], COLORS[topleft], mode))
+
+    return configs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description = "Play headless Othello games for many rule variants.")
+    parser.add_argument('output', help = "JSON lines file of results, appended to and resumed from")
+    parser.add_argument('--sizes', default = '8x8', help = "comma-separated sizes such as 8x8,10x12")
+    parser.add_argument('--first', default = 'B,W', help = "first player colors, B and/or W")
+    parser.add_argument('--topleft', default = 'B,W', help = "top-left center disc colors")
+    parser.add_argument('--modes', default = '>,<', help = "winner modes, > and/or <")
+    parser.add_argument('--games', type = int, default = 100, help = "games per configuration")
+    parser.add_argument('--processes', type = int, default = None, help = "worker processes")
+    parser.add_argument('--random-plies', type = int, default = 4,
+                        help = "opening plies played at random to vary the games")
+    parser.add_argument('--depth', type = int, default = 2,
+                        help = "search depth of both players, 0 for random play")
+    args = parser.parse_args()
+
+    results = run_tournament(_configs_from_args(args), args.games, args.output,
+                             args.processes, args.random_plies, args.depth)
+    print_summary(summarize(results))
+
+
+if __name__ == "__main__":
+    main()
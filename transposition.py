@@ -0,0 +1,173 @@
+import array
+import functools
+import random
+
+
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+NO_SQUARE = -1
+
+# key (8 bytes), depth, score (4 bytes), flag, square (2 bytes), generation
+ENTRY_BYTES = 8 + 1 + 4 + 1 + 2 + 1
+
+
+class ZobristKeys:
+    '''
+    The random keys for hashing positions on a board of a particular size.
+    A position's hash is the XOR of the key of every disc on the board,
+    plus side_to_move when white is to move. The keys are the same in every
+    process, so hashes can be stored and compared between runs.
+    '''
+    def __init__(self, rows: int, col: int) -> None:
+        size = rows * col
+        generator = random.Random(rows * 1000 + col)
+
+        # Keys are kept below 2**63 so they fit in a signed 64-bit array.
+        self.black = tuple(generator.getrandbits(63) for square in range(size))
+        self.white = tuple(generator.getrandbits(63) for square in range(size))
+        self.side_to_move = generator.getrandbits(63)
+
+        # Flipping a disc swaps its black key for its white key.
+        self.flip = tuple(self.black[square] ^ self.white[square] for square in range(size))
+
+    def hash_of(self, black: int, white: int, white_to_move: bool = False) -> int:
+        '''
+        Computes the hash of a position from its disc masks.
+        '''
+        position_hash = self.side_to_move if white_to_move else 0
+        square = 0
+
+        while black or white:
+            if black & 1:
+                position_hash ^= self.black[square]
+            elif white & 1:
+                position_hash ^= self.white[square]
+
+            black >>= 1
+            white >>= 1
+            square += 1
+
+        return position_hash
+
+    def child_hash(self, position_hash: int, own_keys: (int), square: int, flips: int) -> int:
+        '''
+        Returns the hash of the position after a disc with the given keys
+        (black or white) is placed on the square and the discs in flips are
+        flipped, with the other player to move.
+        '''
+        flip_keys = self.flip
+        position_hash ^= self.side_to_move ^ own_keys[square]
+
+        while flips:
+            low_bit = flips & -flips
+            position_hash ^= flip_keys[low_bit.bit_length() - 1]
+            flips ^= low_bit
+
+        return position_hash
+
+
+@functools.cache
+def zobrist_keys(rows: int, col: int) -> ZobristKeys:
+    '''
+    Returns the shared ZobristKeys for the given board dimensions.
+    '''
+    return ZobristKeys(rows, col)
+
+
+class TranspositionTable:
+    '''
+    A fixed-size table of search results keyed by position hash. The
+    memory is set once, in megabytes, and never grows. Entries live in
+    buckets of two: the first slot keeps the deepest result (or any result
+    from an older search), and the second slot always takes the newest.
+    '''
+    def __init__(self, megabytes: float = 16) -> None:
+        self._buckets = max(1, int(megabytes * 1024 * 1024) // (2 * ENTRY_BYTES))
+        entries = 2 * self._buckets
+
+        self._keys = array.array('q', bytes(8 * entries))
+        self._depths = array.array('b', [-1]) * entries
+        self._scores = array.array('i', bytes(4 * entries))
+        self._flags = array.array('B', bytes(entries))
+        self._squares = array.array('h', [NO_SQUARE]) * entries
+        self._generations = array.array('B', bytes(entries))
+        self._generation = 0
+        self._winner_mode = None
+
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def capacity(self) -> int:
+        '''
+        Returns the number of entries the table can hold.
+        '''
+        return len(self._keys)
+
+    def memory_bytes(self) -> int:
+        '''
+        Returns the number of bytes held by the table's arrays.
+        '''
+        return self.capacity() * ENTRY_BYTES
+
+    def new_search(self) -> None:
+        '''
+        Marks the start of a new search, so that older entries can be
+        replaced even by shallower results.
+        '''
+        self._generation = (self._generation + 1) % 256
+
+    def clear(self) -> None:
+        '''
+        Empties the table.
+        '''
+        self._depths = array.array('b', [-1]) * self.capacity()
+        self._squares = array.array('h', [NO_SQUARE]) * self.capacity()
+
+    def set_winner_mode(self, winner_mode: str) -> None:
+        '''
+        Says which winner mode the scores about to be stored are for. The
+        stored scores only hold for the mode they were found in, so the
+        table is emptied when the mode changes.
+        '''
+        if winner_mode != self._winner_mode:
+            self.clear()
+            self._winner_mode = winner_mode
+
+    def probe(self, position_hash: int) -> (int, int, int, int):
+        '''
+        Looks up a position. Returns (depth, score, flag, best square) or
+        None if the position is not stored.
+        '''
+        self.probes += 1
+        first_slot = 2 * (position_hash % self._buckets)
+
+        for slot in (first_slot, first_slot + 1):
+            if self._keys[slot] == position_hash and self._depths[slot] >= 0:
+                self.hits += 1
+                return (self._depths[slot], self._scores[slot],
+                        self._flags[slot], self._squares[slot])
+
+        return None
+
+    def store(self, position_hash: int, depth: int, score: int, flag: int,
+              square: int) -> None:
+        '''
+        Stores a search result, choosing the slot by the replacement policy.
+        '''
+        self.stores += 1
+        slot = 2 * (position_hash % self._buckets)
+
+        if self._keys[slot] != position_hash and self._depths[slot] > depth \
+           and self._generations[slot] == self._generation:
+            # The deep slot holds a more valuable result from this search.
+            slot += 1
+
+        self._keys[slot] = position_hash
+        self._depths[slot] = min(depth, 127)
+        self._scores[slot] = score
+        self._flags[slot] = flag
+        self._squares[slot] = square
+        self._generations[slot] = self._generation